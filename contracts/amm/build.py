@@ -0,0 +1,56 @@
+"""Builds the AMM approval programs to TEAL."""
+
+import argparse
+import os
+
+from contracts.amm import moving_ratio_stable_pool, stable_pool
+from contracts.amm.manager import AMMPoolManager
+from contracts.amm.pool import AMMPool
+from contracts.utils.compile import compile_contract
+
+
+def build_programs(manager_app_id):
+    """
+    Compiles the AMM approval programs, keyed by program name.
+
+    Every program goes through compile_contract, so the deployed TEAL is
+    built with the scratch slot optimizer. pool_algo and pool_asa are the
+    pool program specialized on asset1 being ALGO or an ASA; each needs its
+    hash registered under its own manager validator index.
+    """
+    return {
+        "manager": compile_contract(AMMPoolManager),
+        "pool": compile_contract(AMMPool, manager_app_id),
+        "pool_algo": compile_contract(
+            AMMPool, manager_app_id, asset1_is_algo=True
+        ),
+        "pool_asa": compile_contract(
+            AMMPool, manager_app_id, asset1_is_algo=False
+        ),
+        "stable_pool": compile_contract(
+            stable_pool.AMMStablePool, manager_app_id
+        ),
+        "moving_ratio_stable_pool": compile_contract(
+            moving_ratio_stable_pool.AMMStablePool, manager_app_id
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "manager_app_id", type=int, help="app id of the AMM manager"
+    )
+    parser.add_argument(
+        "--out-dir", default="build", help="directory to write the TEAL to"
+    )
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for name, teal in build_programs(args.manager_app_id).items():
+        with open(os.path.join(args.out_dir, name + ".teal"), "w") as f:
+            f.write(teal)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,8 @@ N_INITIALIZE_POOL_TXN = 3
 # MANAGER PARAMS
 MAX_VALIDATOR_COUNT = Int(8)
 DEFAULT_RESERVE_FACTOR = Int(175000)
+POOL_FUNDING_AMOUNT = Int(400000)
+LOGIC_SIG_FUNDING_AMOUNT = Int(450000)
 
 # POOL PARAMS
 MAX_ASSET_RATIO = Int(1000000000)
@@ -32,14 +34,7 @@ DEFAULT_STABLESWAP_FEE_PCT_SCALED = Int(1000)
 INIT_FLASH_LOAN_FEE = Int(1000)
 INIT_MAX_FLASH_LOAN_RATIO = Int(100000)
 
-
-# POOL TRANSACTION INDICES
-def relative_index(offset):
-    if offset > 0:
-        return Txn.group_index() + Int(offset)
-    else:
-        return Txn.group_index() - Int(abs(offset))
-
+# POOL TRANSACTION INDICES (see relative_index in contracts.utils.constants)
 
 # POOL
 # 1 - asset1 in
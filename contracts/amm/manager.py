@@ -7,17 +7,30 @@ from contracts.amm.constants import (
     FIXED_6_SCALE_FACTOR,
     INIT_FLASH_LOAN_FEE,
     INIT_MAX_FLASH_LOAN_RATIO,
+    LOGIC_SIG_FUNDING_AMOUNT,
     MAX_VALIDATOR_COUNT,
     N_FUND_LOGIC_SIG_TXN,
     N_FUND_MANAGER_TXN,
     N_INITIALIZE_POOL_TXN,
     N_OPT_IN_LOGIC_SIG_TXN,
+    POOL_FUNDING_AMOUNT,
 )
 from contracts.amm.contract_strings import *
-from contracts.amm.subroutines import send_algo_to_receiver
 from contracts.utils.wrapped_var import *
 
 
+# SUBROUTINES
+@Subroutine(TealType.none)
+def set_fixed_6_param(key: Expr, value: Expr) -> Expr:
+    """Sets a global param scaled by 1e6 after checking it is at most 1."""
+    return Seq(
+        [
+            Assert(value <= FIXED_6_SCALE_FACTOR),
+            App.globalPut(key, value),
+        ]
+    )
+
+
 class AMMPoolManagerRegistrant:
     """A helper class to represent the global state of a pool manager registrant."""
 
@@ -61,6 +74,25 @@ class AMMPoolManagerPool:
             pool_application_id.load(),
         ).get()
 
+    def load_state(self):
+        """Reads the pool state once and verifies every value is present."""
+        return Seq(
+            [
+                self.admin,
+                self.asset_1_id,
+                self.asset_2_id,
+                self.validator_index,
+                Assert(
+                    And(
+                        self.admin.hasValue(),
+                        self.asset_1_id.hasValue(),
+                        self.asset_2_id.hasValue(),
+                        self.validator_index.hasValue(),
+                    )
+                ),
+            ]
+        )
+
 
 class AMMPoolManagerPoolValidator:
     """A helper class to access the represent the global state of a pool validator."""
@@ -111,77 +143,46 @@ class AMMPoolManager:
                 self.reserve_factor.put(DEFAULT_RESERVE_FACTOR),
                 self.flash_loan_fee.put(INIT_FLASH_LOAN_FEE),
                 self.max_flash_loan_ratio.put(INIT_MAX_FLASH_LOAN_RATIO),
-                Int(1),
+                Approve(),
             ]
         )
 
     # ADMIN FUNCTIONS
+    # the sender is verified to be the admin when dispatching in approval_program
 
-    def on_set_reserve_factor(self):
-        """A method called by the admin to set the reserve factor."""
-
-        new_reserve_factor = Btoi(Txn.application_args[1])
-        sender_is_admin = Txn.sender() == self.admin.get()
-
+    def _on_set_fixed_6_param(self, var):
+        """A helper to set a param scaled by 1e6 from the first call argument."""
         return Seq(
             [
-                Assert(sender_is_admin),
-                # check that we are increasing the min_scheduled_param_update_delay
-                Assert(new_reserve_factor <= FIXED_6_SCALE_FACTOR),
-                # update min_scheduled_param_update_delay
-                self.reserve_factor.put(new_reserve_factor),
-                Int(1),
+                set_fixed_6_param(var.key, Btoi(Txn.application_args[1])),
+                Approve(),
             ]
         )
 
+    def on_set_reserve_factor(self):
+        """A method called by the admin to set the reserve factor."""
+        return self._on_set_fixed_6_param(self.reserve_factor)
+
     def on_set_flash_loan_fee(self):
         """A method called by the admin to set the flash loan fee."""
-
-        flash_loan_fee = Btoi(Txn.application_args[1])
-        sender_is_admin = Txn.sender() == self.admin.get()
-
-        return Seq(
-            [
-                Assert(sender_is_admin),
-                # check that we are increasing the min_scheduled_param_update_delay
-                Assert(flash_loan_fee <= FIXED_6_SCALE_FACTOR),
-                # update min_scheduled_param_update_delay
-                self.flash_loan_fee.put(flash_loan_fee),
-                Int(1),
-            ]
-        )
+        return self._on_set_fixed_6_param(self.flash_loan_fee)
 
     def on_set_max_flash_loan_ratio(self):
         """A method called by the admin to set the max flash loan ratio."""
-
-        max_flash_loan_ratio = Btoi(Txn.application_args[1])
-        sender_is_admin = Txn.sender() == self.admin.get()
-
-        return Seq(
-            [
-                Assert(sender_is_admin),
-                # check that we are increasing the min_scheduled_param_update_delay
-                Assert(max_flash_loan_ratio <= FIXED_6_SCALE_FACTOR),
-                # update min_scheduled_param_update_delay
-                self.max_flash_loan_ratio.put(max_flash_loan_ratio),
-                Int(1),
-            ]
-        )
+        return self._on_set_fixed_6_param(self.max_flash_loan_ratio)
 
     def on_set_validator(self):
         """A method called by the admin to set the validator for a pool."""
 
         validator_index = Btoi(Txn.application_args[1])
         approval_program_hash = Txn.application_args[2]
-        sender_is_admin = Txn.sender() == self.admin.get()
 
         return Seq(
             [
-                Assert(sender_is_admin),
                 Assert(validator_index < MAX_VALIDATOR_COUNT),
                 self.pool_validator_index_store.store(validator_index),
                 self.validator.pool_hash.put(approval_program_hash),
-                Int(1),
+                Approve(),
             ]
         )
 
@@ -200,9 +201,9 @@ class AMMPoolManager:
         asset_2_id = Btoi(Txn.application_args[1])
         validator_index = Btoi(Txn.application_args[2])
 
-        pool_application_id = Gtxn[N_INITIALIZE_POOL_TXN].application_id()
+        # stored in scratch once at the start of the opt in
+        pool_application_id = self.pool_application_id_store.load()
         pool_approval_program = AppParam.approvalProgram(pool_application_id)
-        pool_approval_program_hash = Sha256(pool_approval_program.value())
         pool_clear_state_program = AppParam.clearStateProgram(
             pool_application_id
         )
@@ -212,42 +213,23 @@ class AMMPoolManager:
         )
 
         def validate_group_structure():
-            """A method to verify the group transaction structure."""
-            return Seq(
-                [
-                    Assert(Global.group_size() == Int(4)),
-                    Assert(Txn.group_index() == Int(N_OPT_IN_LOGIC_SIG_TXN)),
-                ]
-            )
-
-        def validate_fund_manager_txn():
-            """A method to verify the funding transaction."""
-            return Seq(
-                [
-                    Assert(
-                        Gtxn[N_FUND_MANAGER_TXN].receiver()
-                        == Global.current_application_address()
-                    ),
-                    Assert(
-                        Gtxn[N_FUND_MANAGER_TXN].type_enum() == TxnType.Payment
-                    ),
-                    Assert(Gtxn[N_FUND_MANAGER_TXN].amount() == Int(400000)),
-                ]
-            )
-
-        def validate_fund_logic_sig_txn():
-            """A method to verify the logic signature transaction."""
-            return Seq(
-                [
-                    Assert(
-                        Gtxn[N_FUND_LOGIC_SIG_TXN].receiver() == Txn.sender()
-                    ),
-                    Assert(
-                        Gtxn[N_FUND_LOGIC_SIG_TXN].type_enum()
-                        == TxnType.Payment
-                    ),
-                    Assert(Gtxn[N_FUND_LOGIC_SIG_TXN].amount() == Int(450000)),
-                ]
+            """A method to verify the group structure and funding transactions."""
+            return Assert(
+                And(
+                    # group structure
+                    Global.group_size() == Int(4),
+                    Txn.group_index() == Int(N_OPT_IN_LOGIC_SIG_TXN),
+                    # manager funding transaction
+                    Gtxn[N_FUND_MANAGER_TXN].receiver()
+                    == Global.current_application_address(),
+                    Gtxn[N_FUND_MANAGER_TXN].type_enum() == TxnType.Payment,
+                    Gtxn[N_FUND_MANAGER_TXN].amount() == POOL_FUNDING_AMOUNT,
+                    # logic sig funding transaction
+                    Gtxn[N_FUND_LOGIC_SIG_TXN].receiver() == Txn.sender(),
+                    Gtxn[N_FUND_LOGIC_SIG_TXN].type_enum() == TxnType.Payment,
+                    Gtxn[N_FUND_LOGIC_SIG_TXN].amount()
+                    == LOGIC_SIG_FUNDING_AMOUNT,
+                )
             )
 
         def validate_pool_initialization_txn():
@@ -274,20 +256,15 @@ class AMMPoolManager:
             return Seq(
                 [
                     Assert(asset_1_id < asset_2_id),
-                    self.pool_application_id_store.store(pool_application_id),
-                    self.pool.admin,
-                    Assert(self.pool.admin.hasValue()),
-                    self.pool.asset_1_id,
-                    Assert(self.pool.asset_1_id.hasValue()),
-                    self.pool.asset_2_id,
-                    Assert(self.pool.asset_2_id.hasValue()),
-                    self.pool.validator_index,
-                    Assert(self.pool.validator_index.hasValue()),
-                    Assert(self.pool.admin.value() == self.admin.get()),
-                    Assert(self.pool.asset_1_id.value() == asset_1_id),
-                    Assert(self.pool.asset_2_id.value() == asset_2_id),
+                    self.pool.load_state(),
                     Assert(
-                        self.pool.validator_index.value() == validator_index
+                        And(
+                            self.pool.admin.value() == self.admin.get(),
+                            self.pool.asset_1_id.value() == asset_1_id,
+                            self.pool.asset_2_id.value() == asset_2_id,
+                            self.pool.validator_index.value()
+                            == validator_index,
+                        )
                     ),
                 ]
             )
@@ -297,30 +274,35 @@ class AMMPoolManager:
             return Seq(
                 [
                     self.pool_validator_index_store.store(validator_index),
+                    # each app_params_get runs once, value() reads its slot
                     pool_approval_program,
-                    Assert(pool_approval_program.hasValue()),
-                    Assert(
-                        self.validator.pool_hash.get()
-                        == pool_approval_program_hash
-                    ),
                     pool_clear_state_program,
-                    Assert(pool_clear_state_program.hasValue()),
                     manager_clear_state_program,
-                    Assert(manager_clear_state_program.hasValue()),
                     Assert(
-                        pool_clear_state_program.value()
-                        == manager_clear_state_program.value()
+                        And(
+                            pool_approval_program.hasValue(),
+                            pool_clear_state_program.hasValue(),
+                            manager_clear_state_program.hasValue(),
+                            self.validator.pool_hash.get()
+                            == Sha256(pool_approval_program.value()),
+                            pool_clear_state_program.value()
+                            == manager_clear_state_program.value(),
+                        )
                     ),
                 ]
             )
 
         def fund_pool():
             """A method to fund the pool with initial algos."""
-            return Seq(
-                [
-                    # TODO will need to find a better way to do this in AVM 1.1 but this works for now
-                    send_algo_to_receiver(Int(400000), Txn.accounts[1])
-                ]
+            # the payment fails on its own if it would leave the manager
+            # below its min balance, so no balance assert is needed
+            return InnerTxnBuilder.Execute(
+                {
+                    TxnField.type_enum: TxnType.Payment,
+                    TxnField.receiver: Txn.accounts[1],
+                    TxnField.amount: POOL_FUNDING_AMOUNT,
+                    TxnField.fee: Int(0),
+                }
             )
 
         def set_registrant_local_state():
@@ -338,10 +320,11 @@ class AMMPoolManager:
 
         return Seq(
             [
+                self.pool_application_id_store.store(
+                    Gtxn[N_INITIALIZE_POOL_TXN].application_id()
+                ),
                 # validate group transaction composition
                 validate_group_structure(),
-                validate_fund_manager_txn(),
-                validate_fund_logic_sig_txn(),
                 validate_pool_initialization_txn(),
                 # validate target pool approval program and state
                 validate_pool_program(),
@@ -350,7 +333,7 @@ class AMMPoolManager:
                 fund_pool(),
                 # register pool info in this logic sig's local state
                 set_registrant_local_state(),
-                Int(1),
+                Approve(),
             ]
         )
 
@@ -362,65 +345,61 @@ class AMMPoolManager:
         to route the transaction to the appropriate method.
         """
 
+        # the admin is read once on each path: here for admin calls and in
+        # validate_pool_state for opt ins, so it is not cached in scratch
         sender_is_admin = Txn.sender() == self.admin.get()
         is_no_op_appl_call = And(
             Txn.on_completion() == OnComplete.NoOp,
             Txn.type_enum() == TxnType.ApplicationCall,
         )
+        type_of_call = Txn.application_args[0]
 
         return Cond(
             [Txn.application_id() == Int(0), self.on_creation()],
-            [Txn.on_completion() == OnComplete.DeleteApplication, Int(0)],
+            [Txn.on_completion() == OnComplete.DeleteApplication, Reject()],
             [
                 Txn.on_completion() == OnComplete.OptIn,
                 self.on_user_opt_in(),
             ],  # opt in pool
-            [Txn.on_completion() == OnComplete.CloseOut, Int(0)],
+            [Txn.on_completion() == OnComplete.CloseOut, Reject()],
             # admin calls
             [
                 sender_is_admin,
-                Cond(
+                Seq(
                     [
-                        is_no_op_appl_call,
+                        Assert(is_no_op_appl_call),
                         Cond(
                             [
-                                Txn.application_args[0]
-                                == Bytes(
-                                    AMMManagerStrings.set_validator
-                                ),
+                                type_of_call
+                                == Bytes(AMMManagerStrings.set_validator),
                                 self.on_set_validator(),
                             ],
                             [
-                                Txn.application_args[0]
-                                == Bytes(
-                                    AMMManagerStrings.set_reserve_factor
-                                ),
+                                type_of_call
+                                == Bytes(AMMManagerStrings.set_reserve_factor),
                                 self.on_set_reserve_factor(),
                             ],
                             [
-                                Txn.application_args[0]
-                                == Bytes(
-                                    AMMManagerStrings.set_flash_loan_fee
-                                ),
+                                type_of_call
+                                == Bytes(AMMManagerStrings.set_flash_loan_fee),
                                 self.on_set_flash_loan_fee(),
                             ],
                             [
-                                Txn.application_args[0]
+                                type_of_call
                                 == Bytes(
                                     AMMManagerStrings.set_max_flash_loan_ratio
                                 ),
                                 self.on_set_max_flash_loan_ratio(),
                             ],
                         ),
-                    ],
+                    ]
                 ),
             ],
             [
                 And(
                     Txn.on_completion() == OnComplete.NoOp,
-                    Txn.application_args[0]
-                    == Bytes(AMMManagerStrings.farm_ops),
+                    type_of_call == Bytes(AMMManagerStrings.farm_ops),
                 ),
-                Int(1),
+                Approve(),
             ],
         )
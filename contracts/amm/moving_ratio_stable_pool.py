@@ -13,7 +13,7 @@ from contracts.amm.stable_swap_math import (
     compute_other_asset_output_stable_swap,
     interpolate_amplification_factor,
 )
-from contracts.amm.subroutines import op_up
+from contracts.amm.subroutines import mul_div, op_up
 from contracts.utils.wrapped_var import *
 
 
@@ -108,10 +108,12 @@ class AMMStablePool(AMMPool):
         """Calculates the amount of LP tokens to issue for a given deposit."""
 
         D0_store = ScratchVar(TealType.uint64)
+        # interpolated once and shared by both invariant computations
+        amplification_factor_store = ScratchVar(TealType.uint64)
         D0_calc = compute_D(
             self.balance_1.get(),
             self.balance_2.get(),
-            self.get_amplification_factor(),
+            amplification_factor_store.load(),
         )
 
         D1_calc = compute_D(
@@ -119,24 +121,28 @@ class AMMStablePool(AMMPool):
             + self.adjusted_pool_asset1_amount_store.load(),
             self.balance_2.get()
             + self.adjusted_pool_asset2_amount_store.load(),
-            self.get_amplification_factor(),
+            amplification_factor_store.load(),
         )
 
-        lp_issued_calc = WideRatio(
-            [self.lp_circulation.get(), D1_calc - D0_store.load()],
-            [D0_store.load()],
+        lp_issued_calc = mul_div(
+            self.lp_circulation.get(),
+            D1_calc - D0_store.load(),
+            D0_store.load(),
         )
 
-        return If(
-            pool_is_empty,
-            self.lp_issued_store.store(D1_calc),
-            Seq(
-                op_up(
-                    Txn.fee() - Int(3) * Global.min_txn_fee(),
-                    self.manager_app_id,
+        return Seq(
+            amplification_factor_store.store(self.get_amplification_factor()),
+            If(
+                pool_is_empty,
+                self.lp_issued_store.store(D1_calc),
+                Seq(
+                    op_up(
+                        Txn.fee() - Int(3) * Global.min_txn_fee(),
+                        self.manager_app_id,
+                    ),
+                    D0_store.store(D0_calc),
+                    self.lp_issued_store.store(lp_issued_calc),
                 ),
-                D0_store.store(D0_calc),
-                self.lp_issued_store.store(lp_issued_calc),
             ),
         )
 
@@ -9,11 +9,6 @@ from contracts.utils.wrapped_var import *
 
 
 # POOL HELPERS
-def opt_into_asset(asset_id):
-    """Opt into an asset."""
-    return If(asset_id > Int(1), opt_in_to_asa(asset_id))
-
-
 def increment(var, amount):
     """Increment a variable by a given amount."""
     return var.put(var.get() + amount)
@@ -31,71 +26,89 @@ def verify_txn_is_named_application_call(idx, name):
         - to this application
         - with the provided value at arg[0]
     """
-    return Seq(
-        [
-            Assert(Gtxn[idx].on_completion() == OnComplete.NoOp),
-            Assert(Gtxn[idx].type_enum() == TxnType.ApplicationCall),
-            Assert(
-                Gtxn[idx].application_id() == Global.current_application_id()
-            ),
-            Assert(Gtxn[idx].application_args[0] == Bytes(name)),
-        ]
+    return with_txn_index(
+        idx,
+        lambda idx: Assert(
+            And(
+                Gtxn[idx].on_completion() == OnComplete.NoOp,
+                Gtxn[idx].type_enum() == TxnType.ApplicationCall,
+                Gtxn[idx].application_id() == Global.current_application_id(),
+                Gtxn[idx].application_args[0] == Bytes(name),
+            )
+        ),
     )
 
 
-def verify_txn_is_sending_algos_to_pool(idx):
+def verify_txn_is_sending_algos_to_pool(idx, expected_amount=None):
     """
     Verifies that the transaction at the given index is:
         - a Payment transaction
         - to this application's escrow address
         - of non-zero amount
+        - of expected_amount, if provided
     """
-    return Seq(
-        [
-            Assert(Gtxn[idx].type_enum() == TxnType.Payment),
-            Assert(
-                Gtxn[idx].receiver() == Global.current_application_address()
-            ),
-            Assert(Gtxn[idx].amount() > Int(0)),
+
+    def verify(idx):
+        checks = [
+            Gtxn[idx].type_enum() == TxnType.Payment,
+            Gtxn[idx].receiver() == Global.current_application_address(),
+            Gtxn[idx].amount() > Int(0),
         ]
-    )
+        if expected_amount is not None:
+            checks.append(Gtxn[idx].amount() == expected_amount)
+        return Assert(And(*checks))
+
+    return with_txn_index(idx, verify)
 
 
-def verify_txn_is_sending_asa_to_pool(idx, asset_id):
+def verify_txn_is_sending_asa_to_pool(idx, asset_id, expected_amount=None):
     """
     Verifies that the transaction at the given index is:
         - an AssetTransfer transaction
         - to this application's escrow address
         - of the provided asset_id
         - of non-zero amount
+        - of expected_amount, if provided
     """
-    return Seq(
-        [
-            Assert(Gtxn[idx].type_enum() == TxnType.AssetTransfer),
-            Assert(Gtxn[idx].xfer_asset() == asset_id),
-            Assert(
-                Gtxn[idx].asset_receiver()
-                == Global.current_application_address()
-            ),
-            Assert(Gtxn[idx].asset_amount() > Int(0)),
+
+    def verify(idx):
+        checks = [
+            Gtxn[idx].type_enum() == TxnType.AssetTransfer,
+            Gtxn[idx].xfer_asset() == asset_id,
+            Gtxn[idx].asset_receiver() == Global.current_application_address(),
+            Gtxn[idx].asset_amount() > Int(0),
         ]
-    )
+        if expected_amount is not None:
+            checks.append(Gtxn[idx].asset_amount() == expected_amount)
+        return Assert(And(*checks))
+
+    return with_txn_index(idx, verify)
 
 
 class AMMPool:
     """Contract class for the AMM Pool."""
 
     def __init__(
-        self, manager_app_id, swap_fee_pct_scaled=DEFAULT_SWAP_FEE_PCT_SCALED
+        self,
+        manager_app_id,
+        swap_fee_pct_scaled=DEFAULT_SWAP_FEE_PCT_SCALED,
+        asset1_is_algo=None,
     ):
         # CONSTANTS
         self.manager_app_id = Int(manager_app_id)
         # swap fee scaled by 1000000
         self.swap_fee_pct_scaled = swap_fee_pct_scaled
+        # True / False builds a program for ALGO / ASA asset1 pools only,
+        # None checks asset1 at runtime
+        self.asset1_is_algo = asset1_is_algo
 
         # SCRATCH VARS
+        # Slots 0 and 2-29 are fixed. Slots 8, 14, 19 and 20 are read by the
+        # redeem residual calls via ImportScratchValue and must keep their
+        # ids. Slots without an id, including those taken by the MultiValue
+        # based math helpers, are numbered by the compiler from the lowest
+        # id not reserved here, so slot 1 goes to the first of them.
         self.lp_issued_store = ScratchVar(TealType.uint64, 0)
-        self.swap_input_amount_store = ScratchVar(TealType.uint64, 1)
         self.swap_output_amount_store = ScratchVar(TealType.uint64, 2)
         self.swap_fee_store = ScratchVar(TealType.uint64, 3)
         self.pool_asset1_amount_store = ScratchVar(TealType.uint64, 4)
@@ -132,6 +145,8 @@ class AMMPool:
         self.lp_asset_name_store = ScratchVar(TealType.bytes, 27)
         self.lp_issued_from_asset1_store = ScratchVar(TealType.uint64, 28)
         self.lp_issued_from_asset2_store = ScratchVar(TealType.uint64, 29)
+        self.balance_1_store = ScratchVar(TealType.uint64)
+        self.balance_2_store = ScratchVar(TealType.uint64)
 
         # GLOBAL VARS
         self.lp_id = WrappedVar(AMMPoolStrings.lp_id, GLOBAL_VAR)
@@ -236,60 +251,82 @@ class AMMPool:
 
     def convert_asset1_to_lp(self, asset1_amount):
         """Uses a wide ratio to convert asset 1 to an LP amount."""
-        return WideRatio(
-            [asset1_amount, self.lp_circulation.get()], [self.balance_1.get()]
+        return mul_div(
+            asset1_amount,
+            self.lp_circulation.get(),
+            self.balance_1.get(),
         )
 
     def convert_asset2_to_lp(self, asset2_amount):
         """Uses a wide ratio to convert asset 2 to an LP amount."""
-        return WideRatio(
-            [asset2_amount, self.lp_circulation.get()], [self.balance_2.get()]
+        return mul_div(
+            asset2_amount,
+            self.lp_circulation.get(),
+            self.balance_2.get(),
         )
 
     def convert_lp_to_asset1(self, amount_lp):
         """Uses a wide ratio to convert an LP amount to asset1."""
-        return WideRatio(
-            [amount_lp, self.balance_1.get()], [self.lp_circulation.get()]
+        return mul_div(
+            amount_lp,
+            self.balance_1.get(),
+            self.lp_circulation.get(),
         )
 
     def convert_lp_to_asset2(self, amount_lp):
         """Uses a wide ratio to convert an LP amount to asset2."""
-        return WideRatio(
-            [amount_lp, self.balance_2.get()], [self.lp_circulation.get()]
+        return mul_div(
+            amount_lp,
+            self.balance_2.get(),
+            self.lp_circulation.get(),
         )
 
     def swap_exact_asset1_for(self, asset1_amount):
         """Swaps an exact amount of asset 1 for a variable amount of asset 2."""
-        return WideRatio(
-            [self.balance_2.get(), asset1_amount],
-            [self.balance_1.get() + asset1_amount],
+        return mul_div(
+            self.balance_2.get(),
+            asset1_amount,
+            self.balance_1.get() + asset1_amount,
         )
 
     def swap_exact_asset2_for(self, asset2_amount):
         """Swap an exact amount of asset 2 for a variable amount of asset 1."""
-        return WideRatio(
-            [self.balance_1.get(), asset2_amount],
-            [self.balance_2.get() + asset2_amount],
+        return mul_div(
+            self.balance_1.get(),
+            asset2_amount,
+            self.balance_2.get() + asset2_amount,
         )
 
     def swap_for_exact_asset1_amount(self, asset1_amount):
         """Swaps a variable amount of asset 2 for an exact amount of asset 1."""
-        return WideRatio(
-            [self.balance_2.get(), asset1_amount],
-            [self.balance_1.get() - asset1_amount],
-        ) + Int(1)
+        return ceil_wide_ratio(
+            self.balance_2.get(),
+            asset1_amount,
+            self.balance_1.get() - asset1_amount,
+        )
 
     def swap_for_exact_asset2_amount(self, asset2_amount):
         """Swaps a variable amount of asset 1 for an exact amount of asset 2."""
-        return WideRatio(
-            [self.balance_1.get(), asset2_amount],
-            [self.balance_2.get() - asset2_amount],
-        ) + Int(1)
+        return ceil_wide_ratio(
+            self.balance_1.get(),
+            asset2_amount,
+            self.balance_2.get() - asset2_amount,
+        )
+
+    def select_by_asset1_type(self, if_algo, if_asa):
+        """
+        Selects the expression for an ALGO or ASA asset1.
+
+        The choice is made at compile time when the program is specialized on
+        asset1_is_algo, and at runtime otherwise.
+        """
+        if self.asset1_is_algo is None:
+            return If(self.asset1_id.get() == ALGO_ASSET_ID, if_algo, if_asa)
+        return if_algo if self.asset1_is_algo else if_asa
 
     def send_asset1(self, amount):
         """Creates a transaction to send asset 1 to the caller."""
-        return If(
-            self.asset1_id.get() == Int(1),
+        return self.select_by_asset1_type(
             send_algo(amount),
             send_asa(self.asset1_id.get(), amount),
         )
@@ -307,9 +344,12 @@ class AMMPool:
         return Seq(
             [
                 self.manager_reserve_factor,
-                Assert(self.manager_reserve_factor.hasValue()),
                 Assert(
-                    self.manager_reserve_factor.value() <= FIXED_6_SCALE_FACTOR
+                    And(
+                        self.manager_reserve_factor.hasValue(),
+                        self.manager_reserve_factor.value()
+                        <= FIXED_6_SCALE_FACTOR,
+                    )
                 ),
                 self.reserve_factor.put(self.manager_reserve_factor.value()),
             ]
@@ -320,9 +360,12 @@ class AMMPool:
         return Seq(
             [
                 self.manager_flash_loan_fee,
-                Assert(self.manager_flash_loan_fee.hasValue()),
                 Assert(
-                    self.manager_flash_loan_fee.value() <= FIXED_6_SCALE_FACTOR
+                    And(
+                        self.manager_flash_loan_fee.hasValue(),
+                        self.manager_flash_loan_fee.value()
+                        <= FIXED_6_SCALE_FACTOR,
+                    )
                 ),
                 self.flash_loan_fee.put(self.manager_flash_loan_fee.value()),
             ]
@@ -333,10 +376,12 @@ class AMMPool:
         return Seq(
             [
                 self.manager_max_flash_loan_ratio,
-                Assert(self.manager_max_flash_loan_ratio.hasValue()),
                 Assert(
-                    self.manager_max_flash_loan_ratio.value()
-                    <= FIXED_6_SCALE_FACTOR
+                    And(
+                        self.manager_max_flash_loan_ratio.hasValue(),
+                        self.manager_max_flash_loan_ratio.value()
+                        <= FIXED_6_SCALE_FACTOR,
+                    )
                 ),
                 self.max_flash_loan_ratio.put(
                     self.manager_max_flash_loan_ratio.value()
@@ -351,74 +396,79 @@ class AMMPool:
         Move the provided amount from the balance of the provided asset to the
         reserves and updates the cumsum fees appropriately.
         """
-        fee_to_reserve = WideRatio(
-            [amount, self.reserve_factor.get()], [FIXED_6_SCALE_FACTOR]
+        fee_to_reserve = mul_div(
+            amount,
+            self.reserve_factor.get(),
+            FIXED_6_SCALE_FACTOR,
         )
+        # only evaluated inside the If below, after fee_to_reserve is stored
         fees_less_reserve = amount - self.fee_to_reserve_store.load()
+
+        def move_fee_to_reserve(balance, reserve, cumsum_fees):
+            return Seq(
+                [
+                    decrement(balance, self.fee_to_reserve_store.load()),
+                    increment(reserve, self.fee_to_reserve_store.load()),
+                    # update cumsum fees
+                    cumsum_fees.put(
+                        calculate_integer_wrapped_value(
+                            cumsum_fees.get(), fees_less_reserve
+                        )
+                    ),
+                ]
+            )
+
         return Seq(
             [
                 self.fee_to_reserve_store.store(fee_to_reserve),
                 If(
                     fee_is_asset1,
-                    Seq(
-                        [
-                            decrement(
-                                self.balance_1,
-                                self.fee_to_reserve_store.load(),
-                            ),
-                            increment(
-                                self.asset1_reserve,
-                                self.fee_to_reserve_store.load(),
-                            ),
-                            # update cumsum fees
-                            self.cumsum_fees_asset1.put(
-                                calculate_integer_wrapped_value(
-                                    self.cumsum_fees_asset1.get(),
-                                    fees_less_reserve,
-                                )
-                            ),
-                        ]
+                    move_fee_to_reserve(
+                        self.balance_1,
+                        self.asset1_reserve,
+                        self.cumsum_fees_asset1,
                     ),
-                    Seq(
-                        [
-                            decrement(
-                                self.balance_2,
-                                self.fee_to_reserve_store.load(),
-                            ),
-                            increment(
-                                self.asset2_reserve,
-                                self.fee_to_reserve_store.load(),
-                            ),
-                            # update cumsum fees
-                            self.cumsum_fees_asset2.put(
-                                calculate_integer_wrapped_value(
-                                    self.cumsum_fees_asset2.get(),
-                                    fees_less_reserve,
-                                )
-                            ),
-                        ]
+                    move_fee_to_reserve(
+                        self.balance_2,
+                        self.asset2_reserve,
+                        self.cumsum_fees_asset2,
                     ),
                 ),
             ]
         )
 
+    def load_balances(self):
+        """
+        Caches the pool balances in scratch.
+
+        The cache is only valid until the next balance update.
+        """
+        return Seq(
+            [
+                self.balance_1_store.store(self.balance_1.get()),
+                self.balance_2_store.store(self.balance_2.get()),
+            ]
+        )
+
     def validate_asset_ratio(self):
         """
         Validates that the asset ratio is within the bounds.
             - assert that the balance_1 / balance_2 ratio is within 1e9:1
             - no transaction which moves the ratio out of the range is allowed
         """
+        balance_1 = self.balance_1_store.load()
+        balance_2 = self.balance_2_store.load()
+
         return Seq(
             [
-                Assert(self.balance_1.get() >= MIN_POOL_BALANCE),
-                Assert(self.balance_2.get() >= MIN_POOL_BALANCE),
-                Assert(
-                    self.balance_1.get() / self.balance_2.get()
-                    < MAX_ASSET_RATIO
-                ),
+                self.load_balances(),
                 Assert(
-                    self.balance_2.get() / self.balance_1.get()
-                    < MAX_ASSET_RATIO
+                    And(
+                        balance_1 >= MIN_POOL_BALANCE,
+                        balance_2 >= MIN_POOL_BALANCE,
+                        balance_1 / balance_2 < MAX_ASSET_RATIO,
+                        balance_2 / balance_1 < MAX_ASSET_RATIO,
+                    )
                 ),
             ]
         )
@@ -431,6 +481,14 @@ class AMMPool:
         validator_index = Btoi(Txn.application_args[2])
         asset_ids_not_zero = And(asset1_id != Int(0), asset2_id != Int(0))
         asset_ids_increasing_and_different = asset1_id < asset2_id
+        asset_checks = [asset_ids_not_zero, asset_ids_increasing_and_different]
+        # a specialized program may only be created for its asset1 type
+        if self.asset1_is_algo is not None:
+            asset_checks.append(
+                asset1_id == ALGO_ASSET_ID
+                if self.asset1_is_algo
+                else asset1_id != ALGO_ASSET_ID
+            )
 
         # CHECK THE SCHEMA
         global_bytes_sufficient = (
@@ -442,16 +500,19 @@ class AMMPool:
 
         return Seq(
             [
-                # assert schema
-                Assert(global_bytes_sufficient),
-                Assert(global_uints_sufficient),
+                # assert schema and verify assets
+                Assert(
+                    And(
+                        global_bytes_sufficient,
+                        global_uints_sufficient,
+                        *asset_checks,
+                    )
+                ),
                 # set admin to the same admin as the manager
                 self.manager_admin,
                 Assert(self.manager_admin.hasValue()),
                 self.admin.put(self.manager_admin.value()),
-                # verify and set assets
-                Assert(asset_ids_not_zero),
-                Assert(asset_ids_increasing_and_different),
+                # set assets
                 self.asset1_id.put(asset1_id),
                 self.asset2_id.put(asset2_id),
                 # save down validator index
@@ -468,17 +529,37 @@ class AMMPool:
         is_not_initialized = Not(self.initialized.get())
         is_noop_txn = Txn.on_completion() == OnComplete.NoOp
         is_appl_call = Txn.type_enum() == TxnType.ApplicationCall
+        initialize_unset_vars = Seq(
+            [
+                var.put(UNSET_INT)
+                for var in [
+                    self.balance_1,
+                    self.balance_2,
+                    self.lp_circulation,
+                    self.asset1_reserve,
+                    self.asset2_reserve,
+                    self.cumsum_time_weighted_asset1_to_asset2_price,
+                    self.cumsum_time_weighted_asset2_to_asset1_price,
+                    self.cumsum_volume_asset1,
+                    self.cumsum_volume_asset2,
+                    self.cumsum_volume_weighted_asset1_to_asset2_price,
+                    self.cumsum_volume_weighted_asset2_to_asset1_price,
+                    self.cumsum_fees_asset1,
+                    self.cumsum_fees_asset2,
+                ]
+            ]
+        )
 
         return Seq(
             [
-                # must be noop appl call
-                Assert(is_noop_txn),
-                Assert(is_appl_call),
-                # must be uninitialized
-                Assert(is_not_initialized),
+                # must be uninitialized noop appl call
+                Assert(And(is_noop_txn, is_appl_call, is_not_initialized)),
                 # opt into assets and create asa
-                opt_into_asset(self.asset1_id.get()),
-                opt_into_asset(self.asset2_id.get()),
+                self.select_by_asset1_type(
+                    Seq(), opt_in_to_asa(self.asset1_id.get())
+                ),
+                # asset2_id > asset1_id > 0 so asset2 is never ALGO
+                opt_in_to_asa(self.asset2_id.get()),
                 create_lp_asset(
                     self.lp_id,
                     self.lp_asset_prefix,
@@ -495,27 +576,7 @@ class AMMPool:
                 # set latest tine to now
                 self.latest_time.put(Global.latest_timestamp()),
                 # initialize all other global state variables to ensure they have not been tampered with
-                self.balance_1.put(UNSET_INT),
-                self.balance_2.put(UNSET_INT),
-                self.lp_circulation.put(UNSET_INT),
-                self.asset1_reserve.put(UNSET_INT),
-                self.asset2_reserve.put(UNSET_INT),
-                self.cumsum_time_weighted_asset1_to_asset2_price.put(
-                    UNSET_INT
-                ),
-                self.cumsum_time_weighted_asset2_to_asset1_price.put(
-                    UNSET_INT
-                ),
-                self.cumsum_volume_asset1.put(UNSET_INT),
-                self.cumsum_volume_asset2.put(UNSET_INT),
-                self.cumsum_volume_weighted_asset1_to_asset2_price.put(
-                    UNSET_INT
-                ),
-                self.cumsum_volume_weighted_asset2_to_asset1_price.put(
-                    UNSET_INT
-                ),
-                self.cumsum_fees_asset1.put(UNSET_INT),
-                self.cumsum_fees_asset2.put(UNSET_INT),
+                initialize_unset_vars,
                 # set registration variables
                 self.manager_app_id_var.put(self.manager_app_id),
                 self.swap_fee_pct_scaled_var.put(self.swap_fee_pct_scaled),
@@ -532,10 +593,13 @@ class AMMPool:
 
         sender_is_admin = Txn.sender() == self.admin.get()
         return Seq(
-            Assert(sender_is_admin),
-            Assert(self.swap_fee_update_time.get() > Int(0)),
             Assert(
-                Global.latest_timestamp() > self.swap_fee_update_time.get()
+                And(
+                    sender_is_admin,
+                    self.swap_fee_update_time.get() > Int(0),
+                    Global.latest_timestamp()
+                    > self.swap_fee_update_time.get(),
+                )
             ),
             self.swap_fee_pct_scaled_var.put(
                 self.next_swap_fee_pct_scaled_var.get()
@@ -553,15 +617,17 @@ class AMMPool:
 
         return Seq(
             [
-                Assert(sender_is_admin),
-                # check for update delay
                 Assert(
-                    update_time
-                    >= Global.latest_timestamp()
-                    + self.param_update_delay.get()
+                    And(
+                        sender_is_admin,
+                        # check for update delay
+                        update_time
+                        >= Global.latest_timestamp()
+                        + self.param_update_delay.get(),
+                        new_fee > Int(0),
+                        new_fee < MAX_FEE,
+                    )
                 ),
-                Assert(new_fee > Int(0)),
-                Assert(new_fee < MAX_FEE),
                 # set param_update_time after which these new parameters may go into effect
                 self.swap_fee_update_time.put(update_time),
                 self.next_swap_fee_pct_scaled_var.put(new_fee),
@@ -575,8 +641,12 @@ class AMMPool:
         new_param_update_delay = Btoi(Txn.application_args[1])
         sender_is_admin = Txn.sender() == self.admin.get()
         return Seq(
-            Assert(sender_is_admin),
-            Assert(new_param_update_delay > self.param_update_delay.get()),
+            Assert(
+                And(
+                    sender_is_admin,
+                    new_param_update_delay > self.param_update_delay.get(),
+                )
+            ),
             self.param_update_delay.put(new_param_update_delay),
             Int(1),
         )
@@ -593,8 +663,8 @@ class AMMPool:
                 self.send_asset1(self.asset1_reserve.get()),
                 self.send_asset2(self.asset2_reserve.get()),
                 # reset reserves to 0
-                self.asset1_reserve.put(Int(0)),
-                self.asset2_reserve.put(Int(0)),
+                self.asset1_reserve.put(ZERO_AMOUNT),
+                self.asset2_reserve.put(ZERO_AMOUNT),
                 Int(1),
             ]
         )
@@ -606,28 +676,26 @@ class AMMPool:
         A helper method to calculate the LP issuance.
             - First time seeding uses sqrt(a1*a2) as the initial lp issuance
         """
+        asset1_amount = self.adjusted_pool_asset1_amount_store.load()
+        asset2_amount = self.adjusted_pool_asset2_amount_store.load()
+        # 128-bit product of the seeded amounts as (high, low) words
+        seed_product = MultiValue(
+            Op.mulw,
+            [TealType.uint64, TealType.uint64],
+            args=[asset1_amount, asset2_amount],
+        )
+
         return If(
             pool_is_empty,
-            Seq(
-                [
-                    If(
-                        MAX_INT_U64
-                        / self.adjusted_pool_asset1_amount_store.load()
-                        > self.adjusted_pool_asset2_amount_store.load(),
-                        self.lp_issued_store.store(
-                            Sqrt(
-                                self.adjusted_pool_asset1_amount_store.load()
-                                * self.adjusted_pool_asset2_amount_store.load()
-                            )
-                        ),
-                        self.lp_issued_store.store(
-                            Sqrt(self.adjusted_pool_asset1_amount_store.load())
-                            * Sqrt(
-                                self.adjusted_pool_asset2_amount_store.load()
-                            )
-                        ),
-                    )
-                ]
+            seed_product.outputReducer(
+                lambda high, low: If(
+                    high == Int(0),
+                    self.lp_issued_store.store(Sqrt(low)),
+                    # exact sqrt of the full 128-bit product
+                    self.lp_issued_store.store(
+                        Btoi(BytesSqrt(Concat(Itob(high), Itob(low))))
+                    ),
+                )
             ),
             Seq(
                 [
@@ -641,15 +709,17 @@ class AMMPool:
                             self.adjusted_pool_asset2_amount_store.load()
                         )
                     ),
-                    If(
+                    # issue the smaller of the two amounts
+                    self.lp_issued_store.store(
                         self.lp_issued_from_asset1_store.load()
-                        > self.lp_issued_from_asset2_store.load(),
+                    ),
+                    If(
+                        self.lp_issued_from_asset2_store.load()
+                        < self.lp_issued_store.load()
+                    ).Then(
                         self.lp_issued_store.store(
                             self.lp_issued_from_asset2_store.load()
-                        ),
-                        self.lp_issued_store.store(
-                            self.lp_issued_from_asset1_store.load()
-                        ),
+                        )
                     ),
                 ]
             ),
@@ -660,17 +730,18 @@ class AMMPool:
         pool_slippage_pct_scaled = Btoi(
             Txn.application_args[1]
         )  # scaled by 1000000
-        pool_asset_ratio = WideRatio(
-            [self.balance_1.get(), FIXED_9_SCALE_FACTOR],
-            [self.balance_2.get()],
-        )
-        incoming_asset_ratio = WideRatio(
-            [self.pool_asset1_amount_store.load(), FIXED_9_SCALE_FACTOR],
-            [self.pool_asset2_amount_store.load()],
-        )
-        ratio_slippage = WideRatio(
-            [self.pool_asset_ratio_store.load(), FIXED_6_SCALE_FACTOR],
-            [self.incoming_asset_ratio_store.load()],
+        balance_1 = self.balance_1_store.load()
+        balance_2 = self.balance_2_store.load()
+        pool_asset_ratio = mul_div(balance_1, FIXED_9_SCALE_FACTOR, balance_2)
+        incoming_asset_ratio = mul_div(
+            self.pool_asset1_amount_store.load(),
+            FIXED_9_SCALE_FACTOR,
+            self.pool_asset2_amount_store.load(),
+        )
+        ratio_slippage = mul_div(
+            self.pool_asset_ratio_store.load(),
+            FIXED_6_SCALE_FACTOR,
+            self.incoming_asset_ratio_store.load(),
         )
         ratio_slippage_within_tolerance = And(
             self.ratio_slippage_store.load()
@@ -680,14 +751,16 @@ class AMMPool:
         )
 
         # maximum asset1 amount to pool given the full amount of asset2 provided
-        adjusted_pool_asset1_amount = WideRatio(
-            [self.pool_asset2_amount_store.load(), self.balance_1.get()],
-            [self.balance_2.get()],
+        adjusted_pool_asset1_amount = mul_div(
+            self.pool_asset2_amount_store.load(),
+            balance_1,
+            balance_2,
         ) + Int(1)
         # maximum asset2 amount to pool given the full amount of asset1 provided
-        adjusted_pool_asset2_amount = WideRatio(
-            [self.pool_asset1_amount_store.load(), self.balance_2.get()],
-            [self.balance_1.get()],
+        adjusted_pool_asset2_amount = mul_div(
+            self.pool_asset1_amount_store.load(),
+            balance_2,
+            balance_1,
         ) + Int(1)
 
         return If(
@@ -706,75 +779,69 @@ class AMMPool:
             # non-empty pools will pool at the current asset ratio, any remainder will be returned to the sender in the redeem transactions
             Seq(
                 [
+                    self.load_balances(),
                     self.pool_asset_ratio_store.store(pool_asset_ratio),
                     self.incoming_asset_ratio_store.store(
                         incoming_asset_ratio
                     ),
                     self.ratio_slippage_store.store(ratio_slippage),
                     Assert(ratio_slippage_within_tolerance),
-                    Cond(
-                        [
-                            self.incoming_asset_ratio_store.load()
-                            > self.pool_asset_ratio_store.load(),  # too much asset1
-                            Seq(
-                                [
-                                    self.adjusted_pool_asset1_amount_store.store(
-                                        adjusted_pool_asset1_amount
-                                    ),
-                                    self.adjusted_pool_asset2_amount_store.store(
-                                        self.pool_asset2_amount_store.load()
-                                    ),
-                                    self.pool_asset1_residual_store.store(
-                                        self.pool_asset1_amount_store.load()
-                                        - self.adjusted_pool_asset1_amount_store.load()
-                                    ),
-                                    self.pool_asset2_residual_store.store(
-                                        Int(0)
-                                    ),
-                                ]
-                            ),
-                        ],
-                        [
-                            self.incoming_asset_ratio_store.load()
-                            < self.pool_asset_ratio_store.load(),  # too much asset2
-                            Seq(
-                                [
-                                    self.adjusted_pool_asset1_amount_store.store(
-                                        self.pool_asset1_amount_store.load()
-                                    ),
-                                    self.adjusted_pool_asset2_amount_store.store(
-                                        adjusted_pool_asset2_amount
-                                    ),
-                                    self.pool_asset1_residual_store.store(
-                                        Int(0)
-                                    ),
-                                    self.pool_asset2_residual_store.store(
-                                        self.pool_asset2_amount_store.load()
-                                        - self.adjusted_pool_asset2_amount_store.load()
-                                    ),
-                                ]
-                            ),
-                        ],
-                        [
-                            self.incoming_asset_ratio_store.load()
-                            == self.pool_asset_ratio_store.load(),  # sent asset ratio matches current pool ratio precisely
-                            Seq(
-                                [
-                                    self.adjusted_pool_asset1_amount_store.store(
-                                        self.pool_asset1_amount_store.load()
-                                    ),
-                                    self.adjusted_pool_asset2_amount_store.store(
-                                        self.pool_asset2_amount_store.load()
-                                    ),
-                                    self.pool_asset1_residual_store.store(
-                                        Int(0)
-                                    ),
-                                    self.pool_asset2_residual_store.store(
-                                        Int(0)
-                                    ),
-                                ]
-                            ),
-                        ],
+                    If(
+                        self.incoming_asset_ratio_store.load()
+                        > self.pool_asset_ratio_store.load()  # too much asset1
+                    )
+                    .Then(
+                        Seq(
+                            [
+                                self.adjusted_pool_asset1_amount_store.store(
+                                    adjusted_pool_asset1_amount
+                                ),
+                                self.adjusted_pool_asset2_amount_store.store(
+                                    self.pool_asset2_amount_store.load()
+                                ),
+                                self.pool_asset1_residual_store.store(
+                                    self.pool_asset1_amount_store.load()
+                                    - self.adjusted_pool_asset1_amount_store.load()
+                                ),
+                                self.pool_asset2_residual_store.store(Int(0)),
+                            ]
+                        )
+                    )
+                    .ElseIf(
+                        self.incoming_asset_ratio_store.load()
+                        < self.pool_asset_ratio_store.load()  # too much asset2
+                    )
+                    .Then(
+                        Seq(
+                            [
+                                self.adjusted_pool_asset1_amount_store.store(
+                                    self.pool_asset1_amount_store.load()
+                                ),
+                                self.adjusted_pool_asset2_amount_store.store(
+                                    adjusted_pool_asset2_amount
+                                ),
+                                self.pool_asset1_residual_store.store(Int(0)),
+                                self.pool_asset2_residual_store.store(
+                                    self.pool_asset2_amount_store.load()
+                                    - self.adjusted_pool_asset2_amount_store.load()
+                                ),
+                            ]
+                        )
+                    )
+                    # sent asset ratio matches current pool ratio precisely
+                    .Else(
+                        Seq(
+                            [
+                                self.adjusted_pool_asset1_amount_store.store(
+                                    self.pool_asset1_amount_store.load()
+                                ),
+                                self.adjusted_pool_asset2_amount_store.store(
+                                    self.pool_asset2_amount_store.load()
+                                ),
+                                self.pool_asset1_residual_store.store(Int(0)),
+                                self.pool_asset2_residual_store.store(Int(0)),
+                            ]
+                        )
                     ),
                 ]
             ),
@@ -795,12 +862,9 @@ class AMMPool:
         """
 
         def validate_asset1_payment_txn():
-            asset1_is_algo = self.asset1_id.get() == Int(1)
-
             return Seq(
                 [
-                    If(
-                        asset1_is_algo,
+                    self.select_by_asset1_type(
                         Seq(
                             [
                                 verify_txn_is_sending_algos_to_pool(
@@ -843,11 +907,11 @@ class AMMPool:
 
         def validate_pool_txn():
             """Validate pool transaction."""
-            return Seq(
-                [
-                    Assert(Txn.on_completion() == OnComplete.NoOp),
-                    Assert(Txn.type_enum() == TxnType.ApplicationCall),
-                ]
+            return Assert(
+                And(
+                    Txn.on_completion() == OnComplete.NoOp,
+                    Txn.type_enum() == TxnType.ApplicationCall,
+                )
             )
 
         def validate_redeem_asset1_residual_txn():
@@ -866,7 +930,7 @@ class AMMPool:
 
         def validate_lp_issuance_nonzero():
             """Validate lp issuance is nonzero."""
-            return Seq([Assert(self.lp_issued_store.load() > Int(0))])
+            return Assert(self.lp_issued_store.load() > Int(0))
 
         def update_balances():
             """Update balances."""
@@ -891,19 +955,25 @@ class AMMPool:
                 ]
             )
 
-        pool_is_empty = (self.balance_1.get() + self.balance_2.get()) == Int(0)
+        # evaluated once, before any balance is updated
+        pool_is_empty_store = ScratchVar(TealType.uint64)
+        pool_is_empty = pool_is_empty_store.load()
         return Seq(
             [
-                # check asset1 payment is valid: txn type, receiver, amount > 0, asset id
-                validate_asset1_payment_txn(),
-                # check asset2 payment is valid: txn type, receiver, amount > 0, asset id
-                validate_asset2_payment_txn(),
+                # group structure checks are cheapest, so they run first
                 # validate pool txn: application call, noop, args
                 validate_pool_txn(),
                 # validate redeem asset1 residual txn: application call, noop, args
                 validate_redeem_asset1_residual_txn(),
                 # validate redeem asset2 residual txn: application call, noop, args
                 validate_redeem_asset2_residual_txn(),
+                # check asset1 payment is valid: txn type, receiver, amount > 0, asset id
+                validate_asset1_payment_txn(),
+                # check asset2 payment is valid: txn type, receiver, amount > 0, asset id
+                validate_asset2_payment_txn(),
+                pool_is_empty_store.store(
+                    (self.balance_1.get() + self.balance_2.get()) == Int(0)
+                ),
                 # branch if pool is unseeded with tokens (balance1, balance2 == 0)
                 self.adjust_pool_input_amounts(pool_is_empty),
                 self.calculate_lp_issuance(pool_is_empty),
@@ -918,6 +988,36 @@ class AMMPool:
             ]
         )
 
+    def burn_asset_out(
+        self, lp_asset_amount, balance, burn_amount_store, asset_amount
+    ):
+        """
+        Stores the asset amount remitted for burning lp_asset_amount and
+        decrements the asset balance.
+            - the final lp tokens burned receive the full remaining balance
+            - burns which yield 0 of the asset are not permitted
+        """
+        burning_remaining_lp_circulation = (
+            lp_asset_amount == self.lp_circulation.get()
+        )
+
+        return Seq(
+            [
+                If(
+                    burning_remaining_lp_circulation,
+                    burn_amount_store.store(balance.get()),
+                    burn_amount_store.store(asset_amount),
+                ),
+                Assert(
+                    And(
+                        burn_amount_store.load() > Int(0),
+                        burn_amount_store.load() <= balance.get(),
+                    )
+                ),
+                decrement(balance, burn_amount_store.load()),
+            ]
+        )
+
     def on_burn_asset1_out(self):
         """
         A method to burn LP tokens and receive asset 1.
@@ -941,11 +1041,11 @@ class AMMPool:
 
         def validate_burn_asset1_out_txn():
             """Validate burn asset1 out transaction."""
-            return Seq(
-                [
-                    Assert(Txn.on_completion() == OnComplete.NoOp),
-                    Assert(Txn.type_enum() == TxnType.ApplicationCall),
-                ]
+            return Assert(
+                And(
+                    Txn.on_completion() == OnComplete.NoOp,
+                    Txn.type_enum() == TxnType.ApplicationCall,
+                )
             )
 
         def validate_burn_asset2_out_txn():
@@ -957,30 +1057,14 @@ class AMMPool:
 
         def handle_burn_asset1_out_txn():
             """Calculate asset 1 remit, decrement balance 1, send asset to user."""
-            asset1_amount = self.convert_lp_to_asset1(lp_asset_amount)
-            burning_remaining_lp_circulation = (
-                lp_asset_amount == self.lp_circulation.get()
-            )
-
             return Seq(
                 [
-                    # if this is the final lp token send full remaining balance
-                    If(
-                        burning_remaining_lp_circulation,
-                        self.burn_asset1_amount_store.store(
-                            self.balance_1.get()
-                        ),
-                        self.burn_asset1_amount_store.store(asset1_amount),
-                    ),
-                    # do not permit burn which yields 0 asset1
-                    Assert(self.burn_asset1_amount_store.load() > Int(0)),
-                    Assert(
-                        self.burn_asset1_amount_store.load()
-                        <= self.balance_1.get()
-                    ),
-                    # update asset1 balance, lp_circulation will be updated in burn_asset2_out transaction
-                    decrement(
-                        self.balance_1, self.burn_asset1_amount_store.load()
+                    # lp_circulation will be updated in burn_asset2_out transaction
+                    self.burn_asset_out(
+                        lp_asset_amount,
+                        self.balance_1,
+                        self.burn_asset1_amount_store,
+                        self.convert_lp_to_asset1(lp_asset_amount),
                     ),
                     self.send_asset1(self.burn_asset1_amount_store.load()),
                 ]
@@ -1028,39 +1112,23 @@ class AMMPool:
 
         def validate_burn_asset2_out_txn():
             """Validate burn asset2 out transaction."""
-            return Seq(
-                [
-                    Assert(Txn.on_completion() == OnComplete.NoOp),
-                    Assert(Txn.type_enum() == TxnType.ApplicationCall),
-                ]
+            return Assert(
+                And(
+                    Txn.on_completion() == OnComplete.NoOp,
+                    Txn.type_enum() == TxnType.ApplicationCall,
+                )
             )
 
         # calculate asset 2 remit, decrement balance 2, send asset to user AND decrement LP circulation
         def handle_burn_asset2_out_txn():
             """Handle burn asset2 out transaction."""
-            asset2_amount = self.convert_lp_to_asset2(lp_asset_amount)
-            burning_remaining_lp_circulation = (
-                lp_asset_amount == self.lp_circulation.get()
-            )
-
             return Seq(
                 [
-                    If(
-                        burning_remaining_lp_circulation,
-                        self.burn_asset2_amount_store.store(
-                            self.balance_2.get()
-                        ),
-                        self.burn_asset2_amount_store.store(asset2_amount),
-                    ),
-                    # do not permit burn which yields 0 asset2
-                    Assert(self.burn_asset2_amount_store.load() > Int(0)),
-                    Assert(
-                        self.burn_asset2_amount_store.load()
-                        <= self.balance_2.get()
-                    ),
-                    # update asset2 balance and lp_circulation
-                    decrement(
-                        self.balance_2, self.burn_asset2_amount_store.load()
+                    self.burn_asset_out(
+                        lp_asset_amount,
+                        self.balance_2,
+                        self.burn_asset2_amount_store,
+                        self.convert_lp_to_asset2(lp_asset_amount),
                     ),
                     decrement(self.lp_circulation, lp_asset_amount),
                     self.send_asset2(self.burn_asset2_amount_store.load()),
@@ -1091,28 +1159,27 @@ class AMMPool:
         def save_latest_cumsum_time_weighted_price():
             """Save latest cumsum time weighted price."""
             current_time = Global.latest_timestamp()
-            asset1_to_asset2_price = WideRatio(
-                [self.balance_2.get(), FIXED_9_SCALE_FACTOR],
-                [self.balance_1.get()],
+            asset1_to_asset2_price = mul_div(
+                self.balance_2.get(),
+                FIXED_9_SCALE_FACTOR,
+                self.balance_1.get(),
             )
-            asset2_to_asset1_price = WideRatio(
-                [self.balance_1.get(), FIXED_9_SCALE_FACTOR],
-                [self.balance_2.get()],
+            asset2_to_asset1_price = mul_div(
+                self.balance_1.get(),
+                FIXED_9_SCALE_FACTOR,
+                self.balance_2.get(),
             )
-            new_cumsum_time_weighted_asset1_to_asset2_price = (
-                calculate_integer_wrapped_value(
-                    self.cumsum_time_weighted_asset1_to_asset2_price.get(),
-                    self.asset1_to_asset2_price_store.load()
-                    * self.time_delta_store.load(),
-                )
-            )
-            new_cumsum_time_weighted_asset2_to_asset1_price = (
-                calculate_integer_wrapped_value(
-                    self.cumsum_time_weighted_asset2_to_asset1_price.get(),
-                    self.asset2_to_asset1_price_store.load()
-                    * self.time_delta_store.load(),
+
+            def add_time_weighted_price(cumsum_var, price):
+                return if_product_fits(
+                    price,
+                    self.time_delta_store.load(),
+                    lambda price_time: cumsum_var.put(
+                        calculate_integer_wrapped_value(
+                            cumsum_var.get(), price_time
+                        )
+                    ),
                 )
-            )
 
             return Seq(
                 [
@@ -1127,19 +1194,13 @@ class AMMPool:
                         asset2_to_asset1_price
                     ),
                     # only update cumsum_time_weighted_prices if it will not result in an overflow
-                    If(
-                        MAX_INT_U64 / self.asset1_to_asset2_price_store.load()
-                        > self.time_delta_store.load(),
-                        self.cumsum_time_weighted_asset1_to_asset2_price.put(
-                            new_cumsum_time_weighted_asset1_to_asset2_price
-                        ),
+                    add_time_weighted_price(
+                        self.cumsum_time_weighted_asset1_to_asset2_price,
+                        self.asset1_to_asset2_price_store.load(),
                     ),
-                    If(
-                        MAX_INT_U64 / self.asset2_to_asset1_price_store.load()
-                        > self.time_delta_store.load(),
-                        self.cumsum_time_weighted_asset2_to_asset1_price.put(
-                            new_cumsum_time_weighted_asset2_to_asset1_price
-                        ),
+                    add_time_weighted_price(
+                        self.cumsum_time_weighted_asset2_to_asset1_price,
+                        self.asset2_to_asset1_price_store.load(),
                     ),
                 ]
             )
@@ -1153,74 +1214,66 @@ class AMMPool:
             is_payment_txn = (
                 Gtxn[SWAP__SWAP_IN_IDX].type_enum() == TxnType.Payment
             )
-            asset1_is_algo = self.asset1_id.get() == Int(1)
-
             asset_transfered = Gtxn[SWAP__SWAP_IN_IDX].xfer_asset()
             is_valid_asset_to_swap = Or(
                 asset_transfered == self.asset1_id.get(),
                 asset_transfered == self.asset2_id.get(),
             )
-            swap_input_is_asset1 = If(
-                asset_transfered == self.asset1_id.get(), TRUE, FALSE
-            )
+            # == already evaluates to TRUE / FALSE
+            swap_input_is_asset1 = asset_transfered == self.asset1_id.get()
 
-            return Seq(
+            swap_in_algo = Seq(
                 [
-                    If(
-                        is_payment_txn,
-                        Seq(
-                            [
-                                # verify that asset1 is algo, if not then algo is not part of this pool
-                                Assert(asset1_is_algo),
-                                # verify swap in txn is sending algos to this pool
-                                verify_txn_is_sending_algos_to_pool(
-                                    SWAP__SWAP_IN_IDX
-                                ),
-                                # save down data
-                                self.swap_input_amount_store.store(
-                                    Gtxn[SWAP__SWAP_IN_IDX].amount()
-                                ),
-                                self.swap_input_is_asset1_store.store(TRUE),
-                            ]
-                        ),
-                        Seq(
-                            [
-                                # verify that the swap in txn asset is either asset1 or asset2
-                                Assert(is_valid_asset_to_swap),
-                                # verify that the swap in txn is an asset transfer txn with a valid asset to this pool
-                                verify_txn_is_sending_asa_to_pool(
-                                    SWAP__SWAP_IN_IDX, asset_transfered
-                                ),
-                                # save down data
-                                self.swap_input_amount_store.store(
-                                    Gtxn[SWAP__SWAP_IN_IDX].asset_amount()
-                                ),
-                                self.swap_input_is_asset1_store.store(
-                                    swap_input_is_asset1
-                                ),
-                            ]
-                        ),
-                    )
+                    # verify swap in txn is sending algos to this pool
+                    verify_txn_is_sending_algos_to_pool(SWAP__SWAP_IN_IDX),
+                    # save down data
+                    self.swap_input_amount_store.store(
+                        Gtxn[SWAP__SWAP_IN_IDX].amount()
+                    ),
+                    self.swap_input_is_asset1_store.store(TRUE),
+                ]
+            )
+            swap_in_asa = Seq(
+                [
+                    # verify that the swap in txn asset is either asset1 or asset2
+                    Assert(is_valid_asset_to_swap),
+                    # verify that the swap in txn is an asset transfer txn with a valid asset to this pool
+                    verify_txn_is_sending_asa_to_pool(
+                        SWAP__SWAP_IN_IDX, asset_transfered
+                    ),
+                    # save down data
+                    self.swap_input_amount_store.store(
+                        Gtxn[SWAP__SWAP_IN_IDX].asset_amount()
+                    ),
+                    self.swap_input_is_asset1_store.store(
+                        swap_input_is_asset1
+                    ),
                 ]
             )
 
+            # algo is only part of this pool if asset1 is algo
+            if self.asset1_is_algo is False:
+                return swap_in_asa
+            return If(
+                is_payment_txn,
+                self.select_by_asset1_type(swap_in_algo, Err()),
+                swap_in_asa,
+            )
+
         def validate_swap_txn():
             """Validate swap transaction."""
-            return Seq(
-                [
-                    Assert(Txn.on_completion() == OnComplete.NoOp),
-                    Assert(Txn.type_enum() == TxnType.ApplicationCall),
-                ]
+            return Assert(
+                And(
+                    Txn.on_completion() == OnComplete.NoOp,
+                    Txn.type_enum() == TxnType.ApplicationCall,
+                )
             )
 
         def validate_redeem_residual_txn():
-            """Validate redeem residual transaction."""
-            return If(
-                is_swap_for_exact,
-                verify_txn_is_named_application_call(
-                    SWAP__REDEEM_SWAP_RESIDUAL_IDX,
-                    AMMPoolStrings.redeem_swap_residual,
-                ),
+            """Validate redeem residual transaction (swap for exact only)."""
+            return verify_txn_is_named_application_call(
+                SWAP__REDEEM_SWAP_RESIDUAL_IDX,
+                AMMPoolStrings.redeem_swap_residual,
             )
 
         @Subroutine(TealType.none)
@@ -1234,51 +1287,67 @@ class AMMPool:
             new_cumsum_volume_asset2 = calculate_integer_wrapped_value(
                 self.cumsum_volume_asset2.get(), asset2_volume
             )
-            new_cumsum_volume_weighted_asset1_to_asset2_price = (
-                calculate_integer_wrapped_value(
-                    self.cumsum_volume_weighted_asset1_to_asset2_price.get(),
-                    asset2_volume * self.asset1_to_asset2_price_store.load(),
-                )
-            )
-            new_cumsum_volume_weighted_asset2_to_asset1_price = (
-                calculate_integer_wrapped_value(
-                    self.cumsum_volume_weighted_asset2_to_asset1_price.get(),
-                    asset1_volume * self.asset2_to_asset1_price_store.load(),
+
+            def add_volume_weighted_price(cumsum_var, volume, price):
+                return if_product_fits(
+                    volume,
+                    price,
+                    lambda volume_price: cumsum_var.put(
+                        calculate_integer_wrapped_value(
+                            cumsum_var.get(), volume_price
+                        )
+                    ),
                 )
-            )
 
             return Seq(
                 [
                     self.cumsum_volume_asset1.put(new_cumsum_volume_asset1),
                     self.cumsum_volume_asset2.put(new_cumsum_volume_asset2),
                     # only update cumsum_volume_weighted_prices if it will not result in an overflow
-                    If(
-                        MAX_INT_U64 / asset2_volume
-                        > self.asset1_to_asset2_price_store.load(),
-                        self.cumsum_volume_weighted_asset1_to_asset2_price.put(
-                            new_cumsum_volume_weighted_asset1_to_asset2_price
-                        ),
+                    add_volume_weighted_price(
+                        self.cumsum_volume_weighted_asset1_to_asset2_price,
+                        asset2_volume,
+                        self.asset1_to_asset2_price_store.load(),
                     ),
-                    If(
-                        MAX_INT_U64 / asset1_volume
-                        > self.asset2_to_asset1_price_store.load(),
-                        self.cumsum_volume_weighted_asset2_to_asset1_price.put(
-                            new_cumsum_volume_weighted_asset2_to_asset1_price
-                        ),
+                    add_volume_weighted_price(
+                        self.cumsum_volume_weighted_asset2_to_asset1_price,
+                        asset1_volume,
+                        self.asset2_to_asset1_price_store.load(),
                     ),
                 ]
             )
 
+        def settle_swap(input_is_asset1, amount_in, volume_in, amount_out):
+            """
+            Credits amount_in to the input balance, debits and sends
+            amount_out of the other asset, and records the swap volume.
+            """
+            if input_is_asset1:
+                balance_in, balance_out = self.balance_1, self.balance_2
+                send_out = self.send_asset2
+                asset1_volume, asset2_volume = volume_in, amount_out
+            else:
+                balance_in, balance_out = self.balance_2, self.balance_1
+                send_out = self.send_asset1
+                asset1_volume, asset2_volume = amount_out, volume_in
+
+            return Seq(
+                [
+                    increment(balance_in, amount_in),
+                    decrement(balance_out, amount_out),
+                    send_out(amount_out),
+                    save_latest_cumsum_volume(asset1_volume, asset2_volume),
+                ]
+            )
+
         def handle_swap_exact_for():
             """Handle swap exact for by calculating the amount of asset1 or asset2 to swap for."""
             min_amount_to_swap_for = Btoi(Txn.application_args[1])
 
-            swap_fee = WideRatio(
-                [
-                    self.swap_input_amount_store.load(),
-                    self.swap_fee_pct_scaled_var.get(),
-                ],
-                [FIXED_6_SCALE_FACTOR],
+            swap_fee = mul_div(
+                self.swap_input_amount_store.load(),
+                self.swap_fee_pct_scaled_var.get(),
+                FIXED_6_SCALE_FACTOR,
             ) + Int(1)
 
             return Seq(
@@ -1300,18 +1369,9 @@ class AMMPool:
                                         self.swap_input_amount_less_fees_store.load()
                                     )
                                 ),
-                                increment(
-                                    self.balance_1,
+                                settle_swap(
+                                    True,
                                     self.swap_input_amount_store.load(),
-                                ),
-                                decrement(
-                                    self.balance_2,
-                                    self.swap_output_amount_store.load(),
-                                ),
-                                self.send_asset2(
-                                    self.swap_output_amount_store.load()
-                                ),
-                                save_latest_cumsum_volume(
                                     self.swap_input_amount_less_fees_store.load(),
                                     self.swap_output_amount_store.load(),
                                 ),
@@ -1324,20 +1384,11 @@ class AMMPool:
                                         self.swap_input_amount_less_fees_store.load()
                                     )
                                 ),
-                                decrement(
-                                    self.balance_1,
-                                    self.swap_output_amount_store.load(),
-                                ),
-                                increment(
-                                    self.balance_2,
+                                settle_swap(
+                                    False,
                                     self.swap_input_amount_store.load(),
-                                ),
-                                self.send_asset1(
-                                    self.swap_output_amount_store.load()
-                                ),
-                                save_latest_cumsum_volume(
-                                    self.swap_output_amount_store.load(),
                                     self.swap_input_amount_less_fees_store.load(),
+                                    self.swap_output_amount_store.load(),
                                 ),
                             ]
                         ),
@@ -1354,20 +1405,11 @@ class AMMPool:
             """Handle swap for exact by calculating the amount of asset1 or asset2 to swap for."""
             exact_amount_to_swap_for = Btoi(Txn.application_args[1])
 
-            swap_fee = (
-                WideRatio(
-                    [
-                        self.required_swap_input_amount_store.load(),
-                        FIXED_6_SCALE_FACTOR,
-                    ],
-                    [
-                        FIXED_6_SCALE_FACTOR
-                        - self.swap_fee_pct_scaled_var.get()
-                    ],
-                )
-                + Int(1)
-                - self.required_swap_input_amount_store.load()
-            )
+            required_swap_input_amount_plus_fees = mul_div(
+                self.required_swap_input_amount_store.load(),
+                FIXED_6_SCALE_FACTOR,
+                FIXED_6_SCALE_FACTOR - self.swap_fee_pct_scaled_var.get(),
+            ) + Int(1)
 
             return Seq(
                 [
@@ -1393,10 +1435,12 @@ class AMMPool:
                     Assert(
                         self.required_swap_input_amount_store.load() > Int(0)
                     ),
-                    self.swap_fee_store.store(swap_fee),
                     self.required_swap_input_amount_plus_fees_store.store(
-                        self.required_swap_input_amount_store.load()
-                        + self.swap_fee_store.load()
+                        required_swap_input_amount_plus_fees
+                    ),
+                    self.swap_fee_store.store(
+                        self.required_swap_input_amount_plus_fees_store.load()
+                        - self.required_swap_input_amount_store.load()
                     ),
                     Assert(
                         self.swap_input_amount_store.load()
@@ -1404,43 +1448,17 @@ class AMMPool:
                     ),
                     If(
                         self.swap_input_is_asset1_store.load(),
-                        Seq(
-                            [
-                                increment(
-                                    self.balance_1,
-                                    self.required_swap_input_amount_plus_fees_store.load(),
-                                ),
-                                decrement(
-                                    self.balance_2,
-                                    self.exact_amount_to_swap_for_store.load(),
-                                ),
-                                self.send_asset2(
-                                    self.exact_amount_to_swap_for_store.load()
-                                ),
-                                save_latest_cumsum_volume(
-                                    self.required_swap_input_amount_store.load(),
-                                    self.exact_amount_to_swap_for_store.load(),
-                                ),
-                            ]
+                        settle_swap(
+                            True,
+                            self.required_swap_input_amount_plus_fees_store.load(),
+                            self.required_swap_input_amount_store.load(),
+                            self.exact_amount_to_swap_for_store.load(),
                         ),
-                        Seq(
-                            [
-                                decrement(
-                                    self.balance_1,
-                                    self.exact_amount_to_swap_for_store.load(),
-                                ),
-                                increment(
-                                    self.balance_2,
-                                    self.required_swap_input_amount_plus_fees_store.load(),
-                                ),
-                                self.send_asset1(
-                                    self.exact_amount_to_swap_for_store.load()
-                                ),
-                                save_latest_cumsum_volume(
-                                    self.exact_amount_to_swap_for_store.load(),
-                                    self.required_swap_input_amount_store.load(),
-                                ),
-                            ]
+                        settle_swap(
+                            False,
+                            self.required_swap_input_amount_plus_fees_store.load(),
+                            self.required_swap_input_amount_store.load(),
+                            self.exact_amount_to_swap_for_store.load(),
                         ),
                     ),
                     self.residual_amount_store.store(
@@ -1452,20 +1470,24 @@ class AMMPool:
 
         return Seq(
             [
+                # validate swap txn: application call, noop
+                validate_swap_txn(),
                 # update cumulative sum time weighted price
                 save_latest_cumsum_time_weighted_price(),
                 # check for updated reserve factor
                 self.update_reserve_factor(),
-                # validate txn type, on compete
-                validate_asset_payment_txn(),
                 # validate asset: txn type, amount, receiver, asset id
-                validate_swap_txn(),
-                # validate redeem residual txn
-                validate_redeem_residual_txn(),
-                # branch to handle swap-for-exact or swap-exact-for
+                validate_asset_payment_txn(),
+                # branch to handle swap-for-exact or swap-exact-for, only
+                # swap for exact has a redeem residual txn to validate
                 If(
                     is_swap_for_exact,
-                    handle_swap_for_exact(),
+                    Seq(
+                        [
+                            validate_redeem_residual_txn(),
+                            handle_swap_for_exact(),
+                        ]
+                    ),
                     handle_swap_exact_for(),
                 ),
                 # move protocol fee to reserves
@@ -1490,11 +1512,11 @@ class AMMPool:
 
         def validate_redeem_residual_txn():
             """Validate redeem residual transaction."""
-            return Seq(
-                [
-                    Assert(Txn.on_completion() == OnComplete.NoOp),
-                    Assert(Txn.type_enum() == TxnType.ApplicationCall),
-                ]
+            return Assert(
+                And(
+                    Txn.on_completion() == OnComplete.NoOp,
+                    Txn.type_enum() == TxnType.ApplicationCall,
+                )
             )
 
         def validate_residual_source_txn():
@@ -1596,29 +1618,53 @@ class AMMPool:
             - Updates the pool balances
             - Updates the LP circulation
         """
-        flash_loan_asset_id = Btoi(Txn.application_args[1])
-        flash_loan_amount = Btoi(Txn.application_args[2])
-
-        flash_loan_is_algo = flash_loan_asset_id == Int(1)
+        # the args and the asset1 comparison are each read several times, so
+        # they are decoded once into scratch
+        flash_loan_asset_id_store = ScratchVar(TealType.uint64)
+        flash_loan_amount_store = ScratchVar(TealType.uint64)
+        flash_loan_is_asset1_store = ScratchVar(TealType.uint64)
+        flash_loan_asset_id = flash_loan_asset_id_store.load()
+        flash_loan_amount = flash_loan_amount_store.load()
+        flash_loan_is_asset1 = flash_loan_is_asset1_store.load()
+
+        flash_loan_is_algo = flash_loan_asset_id == ALGO_ASSET_ID
         flash_loan_is_valid_asset = Or(
-            flash_loan_asset_id == self.asset1_id.get(),
+            flash_loan_is_asset1,
             flash_loan_asset_id == self.asset2_id.get(),
         )
-        flash_loan_is_asset1 = flash_loan_asset_id == self.asset1_id.get()
         flash_loan_amount_is_nonzero = flash_loan_amount > Int(0)
-        max_asset1_flash_loan = WideRatio(
-            [self.balance_1.get(), self.max_flash_loan_ratio.get()],
-            [FIXED_6_SCALE_FACTOR],
-        )
-        max_asset2_flash_loan = WideRatio(
-            [self.balance_2.get(), self.max_flash_loan_ratio.get()],
-            [FIXED_6_SCALE_FACTOR],
+        # only the balance differs between assets, so one mul_div is emitted
+        max_flash_loan = mul_div(
+            If(
+                flash_loan_is_asset1,
+                self.balance_1.get(),
+                self.balance_2.get(),
+            ),
+            self.max_flash_loan_ratio.get(),
+            FIXED_6_SCALE_FACTOR,
         )
-        flash_loan_fee = WideRatio(
-            [flash_loan_amount, self.flash_loan_fee.get()],
-            [FIXED_6_SCALE_FACTOR],
+        flash_loan_fee = mul_div(
+            flash_loan_amount,
+            self.flash_loan_fee.get(),
+            FIXED_6_SCALE_FACTOR,
         ) + Int(1)
 
+        def load_flash_loan_args():
+            """Load flash loan args."""
+            return Seq(
+                [
+                    flash_loan_asset_id_store.store(
+                        Btoi(Txn.application_args[1])
+                    ),
+                    flash_loan_amount_store.store(
+                        Btoi(Txn.application_args[2])
+                    ),
+                    flash_loan_is_asset1_store.store(
+                        flash_loan_asset_id == self.asset1_id.get()
+                    ),
+                ]
+            )
+
         def load_flash_loan_fee():
             """Load flash loan fee."""
             return Seq(
@@ -1631,48 +1677,37 @@ class AMMPool:
             """Validate flash loan transaction."""
             return Seq(
                 [
-                    Assert(Txn.on_completion() == OnComplete.NoOp),
-                    Assert(Txn.type_enum() == TxnType.ApplicationCall),
-                    Assert(Txn.group_index() == FLASH_LOAN_IDX),
-                    Assert(flash_loan_is_valid_asset),
-                    Assert(flash_loan_amount_is_nonzero),
-                    If(
-                        flash_loan_is_asset1,
-                        Assert(flash_loan_amount <= max_asset1_flash_loan),
-                        Assert(flash_loan_amount <= max_asset2_flash_loan),
+                    Assert(
+                        And(
+                            Txn.on_completion() == OnComplete.NoOp,
+                            Txn.type_enum() == TxnType.ApplicationCall,
+                            Txn.group_index() == FLASH_LOAN_IDX,
+                            flash_loan_is_valid_asset,
+                            flash_loan_amount_is_nonzero,
+                        )
                     ),
                 ]
             )
 
+        def validate_flash_loan_amount():
+            """Validate flash loan amount against the max flash loan ratio."""
+            return Assert(flash_loan_amount <= max_flash_loan)
+
         def validate_flash_loan_repay_txn():
             """Validate flash loan repay transaction."""
+            repay_amount = flash_loan_amount + self.flash_loan_fee_store.load()
+
             return Seq(
                 [
                     If(
                         flash_loan_is_algo,
-                        Seq(
-                            [
-                                verify_txn_is_sending_algos_to_pool(
-                                    FLASH_LOAN_REPAY_IDX
-                                ),
-                                Assert(
-                                    Gtxn[FLASH_LOAN_REPAY_IDX].amount()
-                                    == flash_loan_amount
-                                    + self.flash_loan_fee_store.load()
-                                ),
-                            ]
+                        verify_txn_is_sending_algos_to_pool(
+                            FLASH_LOAN_REPAY_IDX, repay_amount
                         ),
-                        Seq(
-                            [
-                                verify_txn_is_sending_asa_to_pool(
-                                    FLASH_LOAN_REPAY_IDX, flash_loan_asset_id
-                                ),
-                                Assert(
-                                    Gtxn[FLASH_LOAN_REPAY_IDX].asset_amount()
-                                    == flash_loan_amount
-                                    + self.flash_loan_fee_store.load()
-                                ),
-                            ]
+                        verify_txn_is_sending_asa_to_pool(
+                            FLASH_LOAN_REPAY_IDX,
+                            flash_loan_asset_id,
+                            repay_amount,
                         ),
                     )
                 ]
@@ -1707,14 +1742,18 @@ class AMMPool:
 
         return Seq(
             [
+                # store down the flash loan args
+                load_flash_loan_args(),
+                # verify the flash loan txn is properly structured and has valid args
+                validate_flash_loan_txn(),
                 # check for updated reserve factor
                 self.update_reserve_factor(),
                 self.update_flash_loan_fee(),
                 self.update_max_flash_loan_ratio(),
+                # verify the amount against the updated max flash loan ratio
+                validate_flash_loan_amount(),
                 # store down the calculated flash loan fee
                 load_flash_loan_fee(),
-                # verify the flash loan txn is properly structured and has valid args
-                validate_flash_loan_txn(),
                 # verify the final txn of this group is repaying the correct amount and asset
                 validate_flash_loan_repay_txn(),
                 # send funds to borrower
@@ -1785,6 +1824,29 @@ class AMMPool:
                     [
                         is_no_op_appl_call,
                         Cond(
+                            # arms are ordered by expected call volume, so
+                            # swaps pay for the fewest method comparisons
+                            # swap
+                            [
+                                Or(
+                                    Txn.application_args[0]
+                                    == Bytes(
+                                        AMMPoolStrings.swap_for_exact
+                                    ),
+                                    Txn.application_args[0]
+                                    == Bytes(
+                                        AMMPoolStrings.swap_exact_for
+                                    ),
+                                ),
+                                self.on_swap(),
+                            ],
+                            [
+                                Txn.application_args[0]
+                                == Bytes(
+                                    AMMPoolStrings.redeem_swap_residual
+                                ),
+                                self.on_redeem_swap_residual(),
+                            ],
                             # pool
                             [
                                 Txn.application_args[0]
@@ -1816,27 +1878,6 @@ class AMMPool:
                                 == Bytes(AMMPoolStrings.burn_asset2_out),
                                 self.on_burn_asset2_out(),
                             ],
-                            # swap
-                            [
-                                Or(
-                                    Txn.application_args[0]
-                                    == Bytes(
-                                        AMMPoolStrings.swap_for_exact
-                                    ),
-                                    Txn.application_args[0]
-                                    == Bytes(
-                                        AMMPoolStrings.swap_exact_for
-                                    ),
-                                ),
-                                self.on_swap(),
-                            ],
-                            [
-                                Txn.application_args[0]
-                                == Bytes(
-                                    AMMPoolStrings.redeem_swap_residual
-                                ),
-                                self.on_redeem_swap_residual(),
-                            ],
                             # flash loan
                             [
                                 Txn.application_args[0]
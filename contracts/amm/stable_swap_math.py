@@ -3,6 +3,16 @@
 from pyteal import *
 
 from contracts.amm.constants import FIXED_6_SCALE_FACTOR
+from contracts.amm.subroutines import mul_div
+
+
+def itob_constant(value):
+    """Itob of a compile time constant, emitted as a single pushbytes."""
+    return Bytes("base16", value.to_bytes(8, "big").hex())
+
+
+ONE_BYTES = itob_constant(1)
+FIXED_6_SCALE_FACTOR_BYTES = itob_constant(FIXED_6_SCALE_FACTOR.value)
 
 
 @Subroutine(TealType.uint64)
@@ -20,43 +30,45 @@ def compute_D(
     Which converges to a solution, D, where:
         D[j+1] = (A * n**n * sum(x_i) - D[j]**(n+1) / (n**n prod(x_i))) / (A * n**n - 1)
     """
-    n_coins = Int(2)
+    n_coins = 2
+    # n**n is a constant and is folded here rather than being recomputed
+    n_pow_n = Int(n_coins**n_coins)
     S = asset1_amount + asset2_amount
 
     D_estimate = ScratchVar(TealType.bytes)
     D_prev = ScratchVar(TealType.bytes)
     D_prod_denom = ScratchVar(TealType.bytes)
     D_prod = ScratchVar(TealType.bytes)
+    D_prod_n = ScratchVar(TealType.bytes)
     AnnS = ScratchVar(TealType.bytes)
+    Ann_less_scale = ScratchVar(TealType.bytes)
     i = ScratchVar(TealType.uint64)
 
     D_prod_num_calc = BytesMul(
         D_prev.load(), BytesMul(D_prev.load(), D_prev.load())
     )  # D**(n+1)
     D_prod_denom_calc = BytesMul(
-        Itob(Exp(n_coins, n_coins)),
+        itob_constant(n_coins**n_coins),
         BytesMul(Itob(asset2_amount), Itob(asset1_amount)),  # nn*(P[x_i])
     )
     D_prod_calc = BytesDiv(D_prod_num_calc, D_prod_denom.load())
+    # D_prod * n and D_prod * (n+1) by addition, as n == 2
+    D_prod_n_calc = BytesAdd(D_prod.load(), D_prod.load())
 
-    Ann_calc = amplification_param * Exp(n_coins, n_coins)
+    Ann_calc = amplification_param * n_pow_n
     AnnS_calc = BytesDiv(
-        BytesMul(Itob(Ann_calc), Itob(S)), Itob(FIXED_6_SCALE_FACTOR)
+        BytesMul(Itob(Ann_calc), Itob(S)), FIXED_6_SCALE_FACTOR_BYTES
     )
 
     D_estimate_num_calc = BytesMul(
-        BytesAdd(
-            AnnS.load(),
-            BytesMul(D_prod.load(), Itob(n_coins)),
-        ),
-        D_prev.load(),
+        BytesAdd(AnnS.load(), D_prod_n.load()), D_prev.load()
     )
     D_estimate_denom_calc = BytesAdd(
         BytesDiv(
-            BytesMul(Itob(Ann_calc - FIXED_6_SCALE_FACTOR), D_prev.load()),
-            Itob(FIXED_6_SCALE_FACTOR),
+            BytesMul(Ann_less_scale.load(), D_prev.load()),
+            FIXED_6_SCALE_FACTOR_BYTES,
         ),
-        BytesMul(D_prod.load(), Itob(n_coins + Int(1))),
+        BytesAdd(D_prod_n.load(), D_prod.load()),
     )
 
     D_estimate_calc = BytesDiv(D_estimate_num_calc, D_estimate_denom_calc)
@@ -64,6 +76,7 @@ def compute_D(
         If(S == Int(0)).Then(Return(Int(0))),
         # Store expensive calcs that don't need to be recomputed
         AnnS.store(AnnS_calc),
+        Ann_less_scale.store(Itob(Ann_calc - FIXED_6_SCALE_FACTOR)),
         D_prod_denom.store(D_prod_denom_calc),
         # First guess
         D_estimate.store(Itob(S)),
@@ -73,24 +86,19 @@ def compute_D(
             Seq(
                 D_prev.store(D_estimate.load()),
                 D_prod.store(D_prod_calc),
+                D_prod_n.store(D_prod_n_calc),
                 D_estimate.store(D_estimate_calc),
-                If(BytesGt(D_estimate.load(), D_prev.load()))
-                .Then(
-                    If(
-                        BytesLe(
+                # converged once |D_estimate - D_prev| <= 1
+                If(
+                    BytesLe(
+                        If(
+                            BytesGt(D_estimate.load(), D_prev.load()),
                             BytesMinus(D_estimate.load(), D_prev.load()),
-                            Itob(Int(1)),
-                        )
-                    ).Then(Return(Btoi(D_estimate.load())))
-                )
-                .Else(
-                    If(
-                        BytesLe(
                             BytesMinus(D_prev.load(), D_estimate.load()),
-                            Itob(Int(1)),
-                        )
-                    ).Then(Return(Btoi(D_estimate.load())))
-                ),
+                        ),
+                        ONE_BYTES,
+                    )
+                ).Then(Return(Btoi(D_estimate.load()))),
             )
         ),
         Assert(i.load() < Int(255)),  # did not converge, throw error
@@ -124,7 +132,8 @@ def compute_other_asset_output_stable_swap(
     x_1**2 + b*x_1 = c
     x_1 = (x_1**2 + c) / (2*x_1 + b)
     """
-    n_assets = Int(2)
+    n_assets = 2
+    n_pow_n = Int(n_assets**n_assets)
     D = ScratchVar(TealType.uint64)
     b = ScratchVar(TealType.uint64)
     c = ScratchVar(TealType.bytes)
@@ -132,21 +141,21 @@ def compute_other_asset_output_stable_swap(
     new_output_asset_total_estimate_prev = ScratchVar(TealType.uint64)
     i = ScratchVar(TealType.uint64)
 
-    Ann_calc = amplification_param * Exp(n_assets, n_assets)
+    Ann_calc = amplification_param * n_pow_n
     S = input_asset_new_total
 
-    b_calc = S + WideRatio([D.load(), FIXED_6_SCALE_FACTOR], [Ann_calc])
+    b_calc = S + mul_div(D.load(), FIXED_6_SCALE_FACTOR, Ann_calc)
     c_calc = BytesDiv(
         BytesMul(
             Itob(D.load()),
             BytesMul(
                 Itob(D.load()),
-                BytesMul(Itob(D.load()), Itob(FIXED_6_SCALE_FACTOR)),
+                BytesMul(Itob(D.load()), FIXED_6_SCALE_FACTOR_BYTES),
             ),
         ),
         BytesMul(
             Itob(input_asset_new_total),
-            BytesMul(Itob(Ann_calc), Itob(Exp(n_assets, n_assets))),
+            BytesMul(Itob(Ann_calc), itob_constant(n_assets**n_assets)),
         ),
     )
 
@@ -199,24 +208,18 @@ def compute_other_asset_output_stable_swap(
                     new_output_asset_total_estimate.load()
                 ),
                 new_output_asset_total_estimate.store(estimate_calc),
+                # converged once |estimate - estimate_prev| <= 1
                 If(
-                    new_output_asset_total_estimate.load()
-                    > new_output_asset_total_estimate_prev.load()
-                )
-                .Then(
                     If(
                         new_output_asset_total_estimate.load()
-                        - new_output_asset_total_estimate_prev.load()
-                        <= Int(1)
-                    ).Then(ret_calc)
-                )
-                .Else(
-                    If(
+                        > new_output_asset_total_estimate_prev.load(),
+                        new_output_asset_total_estimate.load()
+                        - new_output_asset_total_estimate_prev.load(),
                         new_output_asset_total_estimate_prev.load()
-                        - new_output_asset_total_estimate.load()
-                        <= Int(1)
-                    ).Then(ret_calc)
-                ),
+                        - new_output_asset_total_estimate.load(),
+                    )
+                    <= Int(1)
+                ).Then(ret_calc),
             )
         ),
         Assert(i.load() < Int(255)),  # did not converge, throw error
@@ -237,17 +240,21 @@ def interpolate_amplification_factor(
             .Then(
                 Return(
                     initial_A
-                    + (future_A - initial_A)
-                    * (Global.latest_timestamp() - initial_A_time)
-                    / (future_A_time - initial_A_time)
+                    + mul_div(
+                        future_A - initial_A,
+                        Global.latest_timestamp() - initial_A_time,
+                        future_A_time - initial_A_time,
+                    )
                 )
             )
             .Else(
                 Return(
                     initial_A
-                    - (initial_A - future_A)
-                    * (Global.latest_timestamp() - initial_A_time)
-                    / (future_A_time - initial_A_time)
+                    - mul_div(
+                        initial_A - future_A,
+                        Global.latest_timestamp() - initial_A_time,
+                        future_A_time - initial_A_time,
+                    )
                 )
             )
         )
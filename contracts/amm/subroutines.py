@@ -8,15 +8,87 @@ from contracts.amm.contract_strings import AMMManagerStrings
 # WIDELY USED FCNS
 
 
-@Subroutine(TealType.uint64)
 def calculate_integer_wrapped_value(current_value: Expr, addend: Expr) -> Expr:
-    """Calculates the new value of a wrapped integer variable."""
-    remaining_integer_space = MAX_INT_U64 - current_value
-    return If(
-        addend > remaining_integer_space,
-        Return(addend - remaining_integer_space - Int(1)),
-        Return(current_value + addend),
+    """
+    Calculates the new value of a wrapped integer variable.
+
+    addw returns the carry and the low word of the sum, and the low word is
+    exactly the sum wrapped modulo 2^64, so this is inlined at each call.
+    """
+    return MultiValue(
+        Op.addw,
+        [TealType.uint64, TealType.uint64],
+        args=[current_value, addend],
+    ).outputReducer(lambda carry, wrapped_sum: wrapped_sum)
+
+
+def mul_div(factor_1, factor_2, denominator):
+    """
+    Returns factor_1 * factor_2 / denominator rounded down.
+
+    Equivalent to WideRatio([factor_1, factor_2], [denominator]), but divides
+    the 128-bit product with a single divw, which fails if the quotient
+    overflows 64 bits.
+    """
+    product = MultiValue(
+        Op.mulw, [TealType.uint64, TealType.uint64], args=[factor_1, factor_2]
+    )
+    return product.outputReducer(
+        lambda high, low: MultiValue(
+            Op.divw, [TealType.uint64], args=[high, low, denominator]
+        ).outputReducer(lambda quotient: quotient)
+    )
+
+
+def ceil_wide_ratio(factor_1, factor_2, denominator):
+    """
+    Returns factor_1 * factor_2 / denominator rounded up.
+
+    The product is computed in 128 bits and the quotient must fit in 64 bits.
+    """
+
+    def round_up(quotient_high, quotient_low, remainder_high, remainder_low):
+        return Seq(
+            Assert(quotient_high == Int(0)),
+            quotient_low + (remainder_low > Int(0)),
+        )
+
+    product = MultiValue(
+        Op.mulw, [TealType.uint64, TealType.uint64], args=[factor_1, factor_2]
     )
+    return product.outputReducer(
+        lambda high, low: MultiValue(
+            Op.divmodw,
+            [TealType.uint64] * 4,
+            args=[high, low, Int(0), denominator],
+        ).outputReducer(round_up)
+    )
+
+
+def if_product_fits(factor_1, factor_2, body):
+    """
+    Evaluates body with factor_1 * factor_2 only if the product fits in 64
+    bits, computing the product once with mulw.
+    """
+    product = MultiValue(
+        Op.mulw, [TealType.uint64, TealType.uint64], args=[factor_1, factor_2]
+    )
+    return product.outputReducer(
+        lambda high, low: If(high == Int(0), body(low))
+    )
+
+
+def with_txn_index(idx, body):
+    """
+    Evaluates body with the given group transaction index.
+
+    Relative indices are computed once into scratch so that each Gtxn field
+    access only costs a load.
+    """
+    if isinstance(idx, Int):
+        return body(idx)
+    idx_store = ScratchVar(TealType.uint64)
+    return Seq([idx_store.store(idx), body(idx_store.load())])
 
 
 @Subroutine(TealType.none)
@@ -78,47 +150,36 @@ def send_algo(amount: Expr) -> Expr:
     )
 
 
-@Subroutine(TealType.none)
-def send_algo_to_receiver(amount: Expr, receiver: Expr) -> Expr:
-    """Send Algo to a receiver."""
-    return Seq(
-        [
-            Assert(
-                Ge(
-                    Balance(Global.current_application_address()),
-                    amount + Global.min_balance(),
-                )
-            ),
-            InnerTxnBuilder.Begin(),
-            InnerTxnBuilder.SetField(TxnField.type_enum, TxnType.Payment),
-            InnerTxnBuilder.SetField(TxnField.amount, amount),
-            InnerTxnBuilder.SetField(TxnField.receiver, receiver),
-            InnerTxnBuilder.SetField(TxnField.fee, Int(0)),
-            InnerTxnBuilder.Submit(),
-        ]
-    )
-
-
 @Subroutine(TealType.none)
 def op_up(fee: Expr, op_farm_app_id: Expr):
-    """Increase the available operations for the group transaction."""
+    """
+    Increase the available operations for the group transaction.
+
+    The number of calls is computed once before the loop rather than
+    re-evaluating the fee expression on every iteration.
+    """
     i = ScratchVar(TealType.uint64)
-    n = fee / Int(1000)
-    return For(i.store(Int(0)), i.load() < n, i.store(i.load() + Int(1))).Do(
-        Seq(
-            InnerTxnBuilder.Begin(),
-            InnerTxnBuilder.SetFields(
-                {
-                    TxnField.type_enum: TxnType.ApplicationCall,
-                    TxnField.application_id: op_farm_app_id,
-                    TxnField.application_args: [
-                        Bytes(AMMManagerStrings.farm_ops)
-                    ],
-                    TxnField.fee: Int(0),
-                }
-            ),
-            InnerTxnBuilder.Submit(),
-        )
+    n = ScratchVar(TealType.uint64)
+    return Seq(
+        n.store(fee / Int(1000)),
+        For(
+            i.store(Int(0)), i.load() < n.load(), i.store(i.load() + Int(1))
+        ).Do(
+            Seq(
+                InnerTxnBuilder.Begin(),
+                InnerTxnBuilder.SetFields(
+                    {
+                        TxnField.type_enum: TxnType.ApplicationCall,
+                        TxnField.application_id: op_farm_app_id,
+                        TxnField.application_args: [
+                            Bytes(AMMManagerStrings.farm_ops)
+                        ],
+                        TxnField.fee: Int(0),
+                    }
+                ),
+                InnerTxnBuilder.Submit(),
+            )
+        ),
     )
 
 
@@ -128,13 +189,12 @@ def create_lp_asset(
     """Creates the LP asset."""
     asset1_name = AssetParam.unitName(asset1_id)
     asset2_name = AssetParam.unitName(asset2_id)
+    # "ALGO-" is a single constant, saving a concat on algo pools
     asset_names_concatenated_algo = Concat(
-        lp_asset_prefix,
-        Concat(Bytes("ALGO"), Concat(Bytes("-"), asset2_name.value())),
+        lp_asset_prefix, Bytes("ALGO-"), asset2_name.value()
     )
     asset_names_concatenated_asa = Concat(
-        lp_asset_prefix,
-        Concat(asset1_name.value(), Concat(Bytes("-"), asset2_name.value())),
+        lp_asset_prefix, asset1_name.value(), Bytes("-"), asset2_name.value()
     )
     create_lp_asset_name = Seq(
         [
@@ -153,8 +213,9 @@ def create_lp_asset(
                     [
                         asset1_name,
                         asset2_name,
-                        Assert(asset1_name.hasValue()),
-                        Assert(asset2_name.hasValue()),
+                        Assert(
+                            And(asset1_name.hasValue(), asset2_name.hasValue())
+                        ),
                         lp_asset_name_store.store(
                             asset_names_concatenated_asa
                         ),
@@ -24,7 +24,8 @@ def create_proposal_from_template_and_optin(
     proposer_admin_storage_account,
 ):
     """Creates a proposal from the proposal template and opts it into the admin contract."""
-    proposal_app_id_scratch = ScratchVar(TealType.uint64)
+    # gitxn reads the last submitted inner group, so the created id stays
+    # readable while the funding and opt in group is being built
     proposal_app_id = Gitxn[0].created_application_id()
     proposal_app_address = AppParam.address(proposal_app_id)
 
@@ -47,7 +48,6 @@ def create_proposal_from_template_and_optin(
         InnerTxnBuilder.Submit(),
         # make sure the proposal was created correctly
         MagicAssert(proposal_app_id > Int(0)),
-        proposal_app_id_scratch.store(proposal_app_id),
         # getting the address so that we can determine minimum balances
         proposal_app_address,
         MagicAssert(proposal_app_address.hasValue()),
@@ -65,7 +65,7 @@ def create_proposal_from_template_and_optin(
         InnerTxnBuilder.SetFields(
             {
                 TxnField.type_enum: TxnType.ApplicationCall,
-                TxnField.application_id: proposal_app_id_scratch.load(),
+                TxnField.application_id: proposal_app_id,
                 TxnField.application_args: [
                     Bytes(ProposalStrings.opt_into_admin)
                 ],
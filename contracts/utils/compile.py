@@ -0,0 +1,58 @@
+"""Helpers for compiling contract programs to TEAL."""
+
+from functools import lru_cache
+
+from pyteal import *
+
+TEAL_VERSION = 6
+
+# scratch slot optimization only touches slots without a fixed id, so the
+# reserved slots read cross-transaction via ImportScratchValue are preserved
+OPTIMIZE_OPTIONS = OptimizeOptions(scratch_slots=True)
+
+
+def compile_program(
+    program, mode=Mode.Application, version=TEAL_VERSION, optimize=True
+):
+    """
+    Compiles a program to TEAL.
+
+    Constants are assembled into shared intcblock / bytecblock entries sorted
+    by frequency, with pushint / pushbytes used for single use constants.
+    Passing optimize=False skips the scratch slot optimizer, which is useful
+    when diffing against TEAL generated without it.
+    """
+    return compileTeal(
+        program,
+        mode=mode,
+        version=version,
+        assembleConstants=True,
+        optimize=OPTIMIZE_OPTIONS if optimize else OptimizeOptions(),
+    )
+
+
+@lru_cache(maxsize=None)
+def compile_contract(
+    contract_class,
+    *args,
+    program="approval_program",
+    mode=Mode.Application,
+    version=TEAL_VERSION,
+    optimize=True,
+    **kwargs,
+):
+    """
+    Builds and compiles a contract program, caching the TEAL.
+
+    args and kwargs are passed to the contract constructor and must be
+    hashable. The cache is keyed on the contract class, its constructor args
+    and the compile options, so scripts and tests which compile the same
+    contract repeatedly only build the PyTeal AST once per process.
+    """
+    contract = contract_class(*args, **kwargs)
+    return compile_program(
+        getattr(contract, program)(),
+        mode=mode,
+        version=version,
+        optimize=optimize,
+    )
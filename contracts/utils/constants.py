@@ -29,10 +29,12 @@ URL = Bytes("")
 
 # TXN INDICES
 def relative_index(offset):
+    """Returns the group index of the transaction `offset` away from this one."""
     if offset > 0:
         return Txn.group_index() + Int(offset)
-    else:
-        return Txn.group_index() - Int(abs(offset))
+    if offset < 0:
+        return Txn.group_index() - Int(-offset)
+    return Txn.group_index()
 
 
 FIRST_TRANSACTION = Int(0)
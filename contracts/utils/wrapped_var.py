@@ -16,6 +16,8 @@ class WrappedVar:
         self.name = name
         self.var_type = var_type
         self.name_to_bytes = name_to_bytes
+        # the key expression is built once and shared by every access
+        self.key = Bytes(name) if name_to_bytes else name
         if (
             self.var_type == LOCAL_VAR
             or self.var_type == GLOBAL_EX_VAR
@@ -31,58 +33,26 @@ class WrappedVar:
         """Puts a value into the variable."""
 
         if self.var_type == GLOBAL_VAR:
-            return (
-                App.globalPut(Bytes(self.name), val)
-                if self.name_to_bytes
-                else App.globalPut(self.name, val)
-            )
+            return App.globalPut(self.key, val)
         if self.var_type == LOCAL_VAR:
-            return (
-                App.localPut(self.index, Bytes(self.name), val)
-                if self.name_to_bytes
-                else App.localPut(self.index, self.name, val)
-            )
+            return App.localPut(self.index, self.key, val)
 
-    def get(self, app_id=None):
+    def get(self):
         """Gets a value from the variable."""
 
         if self.var_type == GLOBAL_VAR:
-            return (
-                App.globalGet(Bytes(self.name))
-                if self.name_to_bytes
-                else App.globalGet(self.name)
-            )
+            return App.globalGet(self.key)
         if self.var_type == GLOBAL_EX_VAR:
-            return (
-                App.globalGetEx(self.index, Bytes(self.name))
-                if self.name_to_bytes
-                else App.globalGetEx(self.index, self.name)
-            )
+            return App.globalGetEx(self.index, self.key)
         if self.var_type == LOCAL_VAR:
-            return (
-                App.localGet(self.index, Bytes(self.name))
-                if self.name_to_bytes
-                else App.localGet(self.index, self.name)
-            )
+            return App.localGet(self.index, self.key)
         if self.var_type == LOCAL_EX_VAR:
-            return (
-                App.localGetEx(self.index, self.app_id, Bytes(self.name))
-                if self.name_to_bytes
-                else App.localGetEx(self.index, self.app_id, self.name)
-            )
+            return App.localGetEx(self.index, self.app_id, self.key)
 
     def delete(self):
         """Deletes the variable."""
 
         if self.var_type == GLOBAL_VAR:
-            return (
-                App.globalDel(Bytes(self.name))
-                if self.name_to_bytes
-                else App.globalDel(self.name)
-            )
+            return App.globalDel(self.key)
         if self.var_type == LOCAL_VAR:
-            return (
-                App.localDel(self.index, Bytes(self.name))
-                if self.name_to_bytes
-                else App.localDel(self.index, self.name)
-            )
+            return App.localDel(self.index, self.key)
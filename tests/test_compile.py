@@ -0,0 +1,57 @@
+"""Checks that the AMM programs are built with the scratch slot optimizer."""
+
+import unittest
+
+from contracts.amm import moving_ratio_stable_pool, stable_pool
+from contracts.amm.build import build_programs
+from contracts.amm.pool import AMMPool
+from contracts.utils.compile import compile_contract
+
+MANAGER_APP_ID = 123
+
+POOL_PROGRAMS = {
+    "pool": AMMPool,
+    "stable_pool": stable_pool.AMMStablePool,
+    "moving_ratio_stable_pool": moving_ratio_stable_pool.AMMStablePool,
+}
+
+
+def count_ops(teal):
+    """Counts the opcodes in a TEAL program, skipping labels and pragmas."""
+    return sum(
+        1
+        for line in teal.splitlines()
+        if line and not line.startswith("#") and not line.endswith(":")
+    )
+
+
+class TestCompile(unittest.TestCase):
+    def test_build_uses_optimizer(self):
+        programs = build_programs(MANAGER_APP_ID)
+        for name, contract_class in POOL_PROGRAMS.items():
+            with self.subTest(name):
+                self.assertEqual(
+                    programs[name],
+                    compile_contract(contract_class, MANAGER_APP_ID),
+                )
+
+    def test_optimizer_reduces_op_count(self):
+        for name, contract_class in POOL_PROGRAMS.items():
+            with self.subTest(name):
+                optimized = compile_contract(contract_class, MANAGER_APP_ID)
+                unoptimized = compile_contract(
+                    contract_class, MANAGER_APP_ID, optimize=False
+                )
+                self.assertLess(count_ops(optimized), count_ops(unoptimized))
+
+    def test_specialized_pools_are_shorter(self):
+        programs = build_programs(MANAGER_APP_ID)
+        for name in ("pool_algo", "pool_asa"):
+            with self.subTest(name):
+                self.assertLess(
+                    count_ops(programs[name]), count_ops(programs["pool"])
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""Checks the wide math helpers at their rounding and overflow boundaries."""
+
+import unittest
+
+from pyteal import *
+
+from contracts.amm.subroutines import ceil_wide_ratio, mul_div
+
+MAX_UINT64 = 2**64 - 1
+
+
+class TealError(Exception):
+    """Raised when the evaluated program fails."""
+
+
+def evaluate(expr):
+    """
+    Compiles expr and evaluates the TEAL, returning the uint64 it leaves.
+
+    Only the straight line ops the wide math helpers compile to are
+    supported.
+    """
+    teal = compileTeal(Return(expr), Mode.Application, version=6)
+    stack = []
+    scratch = {}
+    for line in teal.splitlines()[1:]:
+        op, *args = line.split()
+        if op == "int":
+            stack.append(int(args[0]))
+        elif op == "store":
+            scratch[int(args[0])] = stack.pop()
+        elif op == "load":
+            stack.append(scratch[int(args[0])])
+        elif op == "mulw":
+            b, a = stack.pop(), stack.pop()
+            stack.extend(divmod(a * b, 2**64))
+        elif op == "divw":
+            c, b, a = stack.pop(), stack.pop(), stack.pop()
+            if c == 0 or (a << 64 | b) // c > MAX_UINT64:
+                raise TealError("divw")
+            stack.append((a << 64 | b) // c)
+        elif op == "divmodw":
+            d, c, b, a = stack.pop(), stack.pop(), stack.pop(), stack.pop()
+            if (c << 64 | d) == 0:
+                raise TealError("divmodw")
+            quotient, remainder = divmod(a << 64 | b, c << 64 | d)
+            stack.extend(divmod(quotient, 2**64))
+            stack.extend(divmod(remainder, 2**64))
+        elif op == "==":
+            b, a = stack.pop(), stack.pop()
+            stack.append(int(a == b))
+        elif op == ">":
+            b, a = stack.pop(), stack.pop()
+            stack.append(int(a > b))
+        elif op == "+":
+            b, a = stack.pop(), stack.pop()
+            if a + b > MAX_UINT64:
+                raise TealError("+")
+            stack.append(a + b)
+        elif op == "assert":
+            if not stack.pop():
+                raise TealError("assert")
+        elif op == "return":
+            return stack.pop()
+        else:
+            raise NotImplementedError(op)
+
+
+class TestCeilWideRatio(unittest.TestCase):
+    def ceil_wide_ratio(self, factor_1, factor_2, denominator):
+        return evaluate(
+            ceil_wide_ratio(Int(factor_1), Int(factor_2), Int(denominator))
+        )
+
+    def test_exact_division_is_not_rounded_up(self):
+        self.assertEqual(self.ceil_wide_ratio(6, 7, 3), 14)
+
+    def test_remainder_of_one_rounds_up(self):
+        self.assertEqual(self.ceil_wide_ratio(5, 7, 2), 18)
+
+    def test_overflowing_product(self):
+        # (2^64 - 1) * 2 overflows 64 bits and leaves a remainder of 1 mod 47
+        self.assertEqual(
+            self.ceil_wide_ratio(MAX_UINT64, 2, 47), MAX_UINT64 * 2 // 47 + 1
+        )
+        self.assertEqual(
+            self.ceil_wide_ratio(MAX_UINT64, MAX_UINT64, MAX_UINT64),
+            MAX_UINT64,
+        )
+
+    def test_quotient_overflow_fails(self):
+        with self.assertRaises(TealError):
+            self.ceil_wide_ratio(MAX_UINT64, 2, 1)
+
+
+class TestMulDiv(unittest.TestCase):
+    def mul_div(self, factor_1, factor_2, denominator):
+        return evaluate(
+            mul_div(Int(factor_1), Int(factor_2), Int(denominator))
+        )
+
+    def test_exact_division(self):
+        self.assertEqual(self.mul_div(6, 7, 3), 14)
+
+    def test_remainder_of_one_rounds_down(self):
+        self.assertEqual(self.mul_div(5, 7, 2), 17)
+
+    def test_overflowing_product(self):
+        self.assertEqual(self.mul_div(MAX_UINT64, 2, 47), MAX_UINT64 * 2 // 47)
+        self.assertEqual(
+            self.mul_div(MAX_UINT64, MAX_UINT64, MAX_UINT64), MAX_UINT64
+        )
+
+    def test_quotient_overflow_fails(self):
+        with self.assertRaises(TealError):
+            self.mul_div(MAX_UINT64, 2, 1)
+
+    def test_zero_denominator_fails(self):
+        with self.assertRaises(TealError):
+            self.mul_div(6, 7, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()